@@ -1,11 +1,20 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from pathlib import Path
+import asyncio
+import hashlib
 import subprocess
-import whisper
+import threading
 import os
 import re
 import logging
 import glob
+from pathlib import Path
+
+import config
+from utils import storage
+from models import loader
+from models.client import RemoteWhisperModel
+from utils.scheduler import BATCH, get_scheduler
+from utils.singleflight import SingleFlight, file_lock
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -14,21 +23,35 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # 업로드 파일 저장 경로 (절대 경로 사용)
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-UPLOAD_DIR = BASE_DIR / "data" / "uploads"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_DIR = config.UPLOAD_DIR
 
 # Whisper 모델 로드 (lazy loading)
 whisper_model = None
+whisper_model_lock = threading.Lock()
+
+# 동일 입력(비디오 ID/파일 해시)에 대한 동시 요청 병합
+stt_flight = SingleFlight("stt")
+
+# Whisper 동시 실행 제한 (병합된 요청은 슬롯 하나만 사용)
+stt_scheduler = get_scheduler("stt")
 
 def get_whisper_model():
     global whisper_model
-    if whisper_model is None:
-        logger.info("Loading Whisper model...")
-        whisper_model = whisper.load_model("base")
-        logger.info("Whisper model loaded successfully")
+    # 변환 작업이 스레드에서 실행되므로 중복 로드 방지
+    with whisper_model_lock:
+        if whisper_model is None:
+            if config.MODEL_SERVER_SOCKET:
+                # 모델 서버 사용 시 워커 프로세스에는 모델을 로드하지 않음
+                whisper_model = RemoteWhisperModel()
+            else:
+                whisper_model = loader.load_whisper_model()
     return whisper_model
 
+async def run_scheduled(fn, *args):
+    """STT 슬롯을 얻은 뒤 스레드에서 실행 (큐가 가득 차면 429)"""
+    async with stt_scheduler.slot(BATCH):
+        return await asyncio.to_thread(fn, *args)
+
 def extract_video_id(url: str) -> str:
     """유튜브 URL에서 video ID 추출"""
     patterns = [
@@ -54,6 +77,21 @@ async def transcribe_youtube(url: str = Form(...)):
         video_id = extract_video_id(url)
         logger.info(f"Extracted video ID: {video_id}")
 
+        # 같은 영상에 대한 동시 요청은 하나의 다운로드/변환 결과를 공유
+        key = ("youtube", video_id, config.WHISPER_MODEL_NAME)
+        return await stt_flight.do(
+            key, lambda: run_scheduled(process_youtube, url, video_id)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in transcribe_youtube: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+def process_youtube(url: str, video_id: str) -> dict:
+    """유튜브 다운로드 → 오디오 추출 → Whisper 변환 (스레드에서 실행)"""
+    # 다른 워커 프로세스가 같은 파일을 쓰는 동안 대기
+    with file_lock(UPLOAD_DIR / f".{video_id}.lock"):
         video_output = str(UPLOAD_DIR / f"{video_id}.mp4")
         audio_output = str(UPLOAD_DIR / f"{video_id}.wav")
 
@@ -188,6 +226,13 @@ async def transcribe_youtube(url: str = Form(...)):
 
         logger.info(f"Audio file ready: {audio_output}")
 
+        # 다운로드/추출 파일은 중간 산출물로 등록 (용량 초과 시 LRU 삭제 대상)
+        # 결합 단계에서 원본 영상을 다시 사용하므로 작업이 끝날 때까지 보호
+        storage.hold(video_id)
+        storage.register(video_output, storage.INTERMEDIATE, job_id=video_id)
+        storage.register(audio_output, storage.INTERMEDIATE, job_id=video_id)
+        storage.enforce_quota()
+
         # Whisper로 음성 인식
         logger.info("Starting transcription...")
         model = get_whisper_model()
@@ -203,29 +248,44 @@ async def transcribe_youtube(url: str = Form(...)):
             "language": transcription_result["language"],
             "audio_file": audio_output
         }
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error in transcribe_youtube: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.post("/upload")
 async def transcribe_upload(file: UploadFile = File(...)):
     """업로드된 비디오/오디오 파일을 텍스트로 변환"""
     try:
         logger.info(f"Uploading file: {file.filename}")
+        content = await file.read()
+
+        # 같은 내용의 파일에 대한 동시 요청은 파일명과 관계없이 하나의 변환 결과를 공유
+        content_hash = hashlib.sha256(content).hexdigest()
+        # 저장 경로도 내용 해시로 정함 (사용자 파일명이 다른 업로드를 덮어쓰지 않도록)
+        file_path = UPLOAD_DIR / f"upload_{content_hash[:16]}{Path(file.filename or '').suffix.lower()}"
+        key = ("upload", content_hash, config.WHISPER_MODEL_NAME)
+        result = await stt_flight.do(
+            key, lambda: run_scheduled(process_upload, file_path, content)
+        )
+        return {**result, "filename": file.filename}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in transcribe_upload: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-        # 파일 저장
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+def process_upload(file_path: Path, content: bytes) -> dict:
+    """업로드 파일 저장 → 오디오 추출 → Whisper 변환 (스레드에서 실행)"""
+    with file_lock(UPLOAD_DIR / f".{file_path.stem}.lock"):
+        # 파일 저장 (같은 해시의 파일이 이미 있으면 내용이 같으므로 그대로 사용)
+        if not file_path.exists():
+            tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+            with open(tmp_path, "wb") as buffer:
+                buffer.write(content)
+            tmp_path.replace(file_path)
 
         logger.info(f"File saved to: {file_path}")
 
         # 비디오에서 오디오 추출 (필요시)
         audio_path = file_path
-        if file.filename.endswith(('.mp4', '.avi', '.mov', '.mkv')):
+        if file_path.suffix in ('.mp4', '.avi', '.mov', '.mkv'):
             audio_path = UPLOAD_DIR / f"{file_path.stem}.wav"
             logger.info(f"Extracting audio to: {audio_path}")
 
@@ -251,6 +311,11 @@ async def transcribe_upload(file: UploadFile = File(...)):
 
             logger.info("Audio extraction completed")
 
+        storage.hold(file_path.stem)
+        storage.register(file_path, storage.INTERMEDIATE, job_id=file_path.stem)
+        storage.register(audio_path, storage.INTERMEDIATE, job_id=file_path.stem)
+        storage.enforce_quota()
+
         # Whisper로 음성 인식
         logger.info("Starting transcription...")
         model = get_whisper_model()
@@ -260,17 +325,11 @@ async def transcribe_upload(file: UploadFile = File(...)):
 
         return {
             "status": "success",
-            "filename": file.filename,
             "text": transcription_result["text"],
             "segments": transcription_result["segments"],
             "language": transcription_result["language"],
             "audio_file": str(audio_path)
         }
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error in transcribe_upload: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.post("/transcribe-file")
 async def transcribe_audio_file(audio_path: str = Form(...)):
@@ -279,8 +338,10 @@ async def transcribe_audio_file(audio_path: str = Form(...)):
         if not os.path.exists(audio_path):
             raise HTTPException(status_code=404, detail="Audio file not found")
 
-        model = get_whisper_model()
-        result = model.transcribe(audio_path)
+        key = ("file", audio_path, os.path.getmtime(audio_path), config.WHISPER_MODEL_NAME)
+        result = await stt_flight.do(
+            key, lambda: run_scheduled(lambda: get_whisper_model().transcribe(audio_path))
+        )
 
         return {
             "status": "success",
@@ -288,5 +349,7 @@ async def transcribe_audio_file(audio_path: str = Form(...)):
             "segments": result["segments"],
             "language": result["language"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,6 +3,9 @@ from pydantic import BaseModel
 from deep_translator import GoogleTranslator
 from typing import List, Dict
 
+from utils.dedup import dedup_stats, dedup_texts
+from utils.segmentation import merge_segments
+
 router = APIRouter()
 
 # 지원 언어
@@ -32,6 +35,8 @@ class SegmentTranslationRequest(BaseModel):
     segments: List[Dict]
     source_lang: str = "auto"
     target_lang: str
+    # Whisper 조각을 문장 단위로 병합 후 번역 (번역/TTS 호출 수 감소)
+    merge_segments: bool = True
 
 @router.get("/languages")
 async def get_supported_languages():
@@ -67,22 +72,35 @@ async def translate_segments(request: SegmentTranslationRequest):
             target=request.target_lang
         )
 
+        segments = request.segments
+        if request.merge_segments:
+            segments = merge_segments(segments)
+
+        # 같은 문장은 한 번만 번역하고 모든 등장 위치에 결과를 적용
+        unique_texts, text_index = dedup_texts([segment["text"] for segment in segments])
+        unique_translations = [translator.translate(text) for text in unique_texts]
+
         translated_segments = []
-        for segment in request.segments:
-            translated_text = translator.translate(segment["text"])
-            translated_segments.append({
+        for segment, unique_index in zip(segments, text_index):
+            translated_segment = {
                 "id": segment.get("id"),
                 "start": segment.get("start"),
                 "end": segment.get("end"),
                 "original_text": segment["text"],
-                "translated_text": translated_text
-            })
+                "translated_text": unique_translations[unique_index]
+            }
+            # 원본 Whisper 세그먼트 매핑 유지 (비디오 결합 시 정렬용)
+            if "source_segments" in segment:
+                translated_segment["source_segments"] = segment["source_segments"]
+            translated_segments.append(translated_segment)
 
         return {
             "status": "success",
             "source_lang": request.source_lang,
             "target_lang": request.target_lang,
-            "segments": translated_segments
+            "segments": translated_segments,
+            "original_segments_count": len(request.segments),
+            "dedup": dedup_stats(len(segments), len(unique_texts))
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -100,19 +118,22 @@ async def batch_translate(
             target=target_lang
         )
 
+        unique_texts, text_index = dedup_texts(texts)
+        unique_translations = [translator.translate(text) for text in unique_texts]
+
         translations = []
-        for text in texts:
-            translated = translator.translate(text)
+        for text, unique_index in zip(texts, text_index):
             translations.append({
                 "original": text,
-                "translated": translated
+                "translated": unique_translations[unique_index]
             })
 
         return {
             "status": "success",
             "source_lang": source_lang,
             "target_lang": target_lang,
-            "translations": translations
+            "translations": translations,
+            "dedup": dedup_stats(len(texts), len(unique_texts))
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,31 +1,72 @@
 from fastapi import APIRouter, HTTPException, Form
+from fastapi.responses import Response
 from pydantic import BaseModel
-from pathlib import Path
-import torch
-from TTS.api import TTS
+import asyncio
 import os
 import json
+import threading
+import uuid
+
+import config
+from utils import storage
+from utils.audio_store import AudioStore
+from utils.dedup import dedup_stats, dedup_texts
+from utils.media import touch_throttled
+from models import loader
+from models.client import RemoteTTSModel
+from utils.scheduler import BATCH, INTERACTIVE, get_scheduler
 
 router = APIRouter()
 
 # 생성된 오디오 저장 경로
-OUTPUT_DIR = Path("../data/outputs")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_DIR = config.OUTPUT_DIR
 
-VOICE_MODEL_DIR = Path("../data/voice_models")
+VOICE_MODEL_DIR = config.VOICE_MODEL_DIR
+AUDIO_STORE_DIR = config.AUDIO_STORE_DIR
 
 # TTS 모델 (lazy loading)
 tts_model = None
+tts_model_lock = threading.Lock()
+
+# XTTS 동시 실행 제한 (미리듣기 합성이 배치 작업보다 우선)
+tts_scheduler = get_scheduler("tts")
 
 def get_tts_model():
     global tts_model
-    if tts_model is None:
-        # Coqui XTTS-v2 모델 사용 (다국어 + 음성 복제 지원)
-        tts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-        if torch.cuda.is_available():
-            tts_model = tts_model.to("cuda")
+    # 이벤트 루프를 막지 않도록 스레드에서 호출하므로 중복 로드 방지
+    with tts_model_lock:
+        if tts_model is None:
+            if config.MODEL_SERVER_SOCKET:
+                # 모델 서버 사용 시 워커 프로세스에는 모델을 로드하지 않음
+                tts_model = RemoteTTSModel()
+            else:
+                tts_model = loader.load_tts_model()
     return tts_model
 
+def tts_sample_rate(model) -> int:
+    """출력 샘플레이트 (모델 서버 사용 시 소켓 요청이므로 스레드에서 호출)"""
+    if isinstance(model, RemoteTTSModel):
+        return model.output_sample_rate
+    return model.synthesizer.output_sample_rate
+
+def get_reference_audio(user_voice_dir):
+    """음성 복제용 참조 WAV 경로 (XTTS는 파일 경로를 입력으로 받음)"""
+    reference_path = user_voice_dir / "reference.wav"
+    if reference_path.exists():
+        return reference_path
+
+    # 학습 전이면 샘플 저장소의 첫 번째 샘플을 내보내서 사용
+    sample_store = AudioStore(user_voice_dir, "samples")
+    keys = sorted(sample_store.keys(), key=int)
+    if keys:
+        return sample_store.export_wav(keys[0], reference_path)
+
+    # 이전 형식 (sample_N.wav 개별 파일)
+    legacy_samples = list(user_voice_dir.glob("sample_*.wav"))
+    if legacy_samples:
+        return legacy_samples[0]
+    raise HTTPException(status_code=404, detail=f"No voice samples found for user {user_voice_dir.name}")
+
 class TTSRequest(BaseModel):
     text: str
     user_id: str
@@ -58,21 +99,23 @@ async def synthesize_speech(
             )
 
         # 참조 음성 파일 (첫 번째 샘플 사용)
-        reference_audio = list(user_voice_dir.glob("sample_*.wav"))[0]
-
-        # TTS 모델 로드
-        model = get_tts_model()
+        reference_audio = get_reference_audio(user_voice_dir)
 
         # 출력 파일 경로
         output_path = OUTPUT_DIR / output_filename
 
-        # 음성 합성 (음성 복제)
-        model.tts_to_file(
-            text=text,
-            file_path=str(output_path),
-            speaker_wav=str(reference_audio),
-            language=language
-        )
+        # 음성 합성 (음성 복제) - 대화형 우선순위
+        async with tts_scheduler.slot(INTERACTIVE):
+            model = await asyncio.to_thread(get_tts_model)
+            await asyncio.to_thread(
+                model.tts_to_file,
+                text=text,
+                file_path=str(output_path),
+                speaker_wav=str(reference_audio),
+                language=language
+            )
+        storage.register(output_path, storage.INTERMEDIATE, job_id=f"tts-{user_id}")
+        storage.enforce_quota()
 
         return {
             "status": "success",
@@ -80,6 +123,8 @@ async def synthesize_speech(
             "text": text,
             "language": language
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -87,7 +132,8 @@ async def synthesize_speech(
 async def synthesize_segments(
     segments: str = Form(...),  # JSON string
     user_id: str = Form(...),
-    language: str = Form("ko")
+    language: str = Form("ko"),
+    output_format: str = Form("store")  # "store" (작업별 오디오 저장소) 또는 "wav" (세그먼트별 파일)
 ):
     """세그먼트별로 음성 합성 (자막 타이밍 맞춤)"""
     try:
@@ -102,42 +148,103 @@ async def synthesize_segments(
                 detail=f"Voice model not found for user {user_id}"
             )
 
-        reference_audio = list(user_voice_dir.glob("sample_*.wav"))[0]
-        model = get_tts_model()
+        reference_audio = get_reference_audio(user_voice_dir)
 
-        synthesized_segments = []
-        for i, segment in enumerate(segments_data):
-            output_filename = f"segment_{i}_{segment.get('id', i)}.wav"
-            output_path = OUTPUT_DIR / output_filename
+        # 배치 작업은 시작 시점에 한 번 admission 확인 후 세그먼트마다 슬롯을 획득
+        # (세그먼트 사이에 대화형 요청이 먼저 실행될 수 있음)
+        tts_scheduler.admit(BATCH)
+        # 모델 로드와 샘플레이트 조회도 슬롯 안에서 스레드로 실행
+        async with tts_scheduler.slot(BATCH, bounded=False):
+            model = await asyncio.to_thread(get_tts_model)
+            sample_rate = await asyncio.to_thread(tts_sample_rate, model)
 
-            model.tts_to_file(
-                text=segment["translated_text"],
-                file_path=str(output_path),
-                speaker_wav=str(reference_audio),
-                language=language
-            )
+        # 같은 번역문은 한 번만 합성하고 모든 등장 위치에서 같은 오디오를 사용
+        unique_texts, text_index = dedup_texts(
+            [segment["translated_text"] for segment in segments_data]
+        )
+        # 합성 결과는 작업별 저장소(PCM 파일 하나 + 인덱스)에 추가
+        job_id = uuid.uuid4().hex[:12]
+        audio_store = AudioStore(AUDIO_STORE_DIR, job_id)
+        # 결합 단계에서 사용할 때까지 삭제 대상에서 제외
+        storage.hold(job_id)
+        synthesized = set()
+        # 작업 동안 인덱스는 메모리에 두고 합성이 끝나면 한 번만 기록
+        with audio_store.batch():
+            for unique_index in text_index:
+                if unique_index in synthesized:
+                    continue
+                async with tts_scheduler.slot(BATCH, bounded=False):
+                    samples = await asyncio.to_thread(
+                        model.tts,
+                        text=unique_texts[unique_index],
+                        speaker_wav=str(reference_audio),
+                        language=language
+                    )
+                await asyncio.to_thread(audio_store.append, str(unique_index), samples, sample_rate)
+                synthesized.add(unique_index)
+        storage.register(audio_store.pcm_path, storage.INTERMEDIATE, job_id=job_id)
 
-            synthesized_segments.append({
+        # 세그먼트별 WAV 파일이 필요한 경우 (외부 도구 연동 등)
+        unique_audio_files = {}
+        if output_format == "wav":
+            for i, (segment, unique_index) in enumerate(zip(segments_data, text_index)):
+                if unique_index in unique_audio_files:
+                    continue
+                output_path = OUTPUT_DIR / f"segment_{i}_{segment.get('id', i)}.wav"
+                audio_store.export_wav(str(unique_index), output_path)
+                storage.register(output_path, storage.INTERMEDIATE, job_id=job_id)
+                unique_audio_files[unique_index] = str(output_path)
+
+        synthesized_segments = []
+        for segment, unique_index in zip(segments_data, text_index):
+            synthesized_segment = {
                 "id": segment.get("id"),
                 "start": segment.get("start"),
                 "end": segment.get("end"),
                 "text": segment["translated_text"],
-                "audio_file": str(output_path)
-            })
+                "audio_store": job_id,
+                "audio_key": str(unique_index)
+            }
+            if unique_index in unique_audio_files:
+                synthesized_segment["audio_file"] = unique_audio_files[unique_index]
+            if "source_segments" in segment:
+                synthesized_segment["source_segments"] = segment["source_segments"]
+            synthesized_segments.append(synthesized_segment)
+
+        storage.enforce_quota()
 
         return {
             "status": "success",
             "segments": synthesized_segments,
-            "language": language
+            "audio_store": job_id,
+            "sample_rate": sample_rate,
+            "language": language,
+            "dedup": dedup_stats(len(segments_data), len(unique_texts))
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/audio/{job_id}/{key}.wav")
+async def export_segment_audio(job_id: str, key: str):
+    """저장소의 세그먼트 오디오를 WAV로 내보내기"""
+    audio_store = AudioStore(AUDIO_STORE_DIR, job_id)
+    if not job_id.isalnum() or not audio_store.exists():
+        raise HTTPException(status_code=404, detail="Audio store not found")
+    await touch_throttled(audio_store.pcm_path)
+    try:
+        return Response(content=audio_store.wav_bytes(key), media_type="audio/wav")
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Segment audio not found")
+
 @router.get("/voices")
 async def list_available_voices():
     """학습된 음성 모델 목록"""
     try:
         voices = []
+        if not VOICE_MODEL_DIR.exists():
+            return {"voices": voices}
         for user_dir in VOICE_MODEL_DIR.iterdir():
             if user_dir.is_dir():
                 metadata_path = user_dir / "metadata.json"
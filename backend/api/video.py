@@ -1,73 +1,290 @@
-from fastapi import APIRouter, HTTPException, Form
-from pathlib import Path
+from fastapi import APIRouter, HTTPException, Form, Query, Request
+import asyncio
+import logging
+import shutil
 import subprocess
 import json
+import threading
+import uuid
+import wave
 from typing import List, Dict
 
+import config
+from utils import storage
+from utils.audio_store import SAMPLE_DTYPE, AudioStore
+from utils.media import media_response, resolve_media_path
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-OUTPUT_DIR = Path("../data/outputs")
-UPLOAD_DIR = Path("../data/uploads")
+OUTPUT_DIR = config.OUTPUT_DIR
+UPLOAD_DIR = config.UPLOAD_DIR
+HLS_DIR = config.HLS_DIR
+
+# 결합 작업 상태 (HLS 요청은 mp4 결합이 끝나기 전에 응답하므로 워커별로 진행 상황 보관)
+combine_jobs: Dict[str, Dict] = {}
+
+def _tee_escape(value: str, special: str) -> str:
+    return "".join("\\" + char if char in special + "\\'" else char for char in value)
+
+def build_mux_command(video_path: str, audio_path: str, mp4_path, hls_dir=None) -> List[str]:
+    """비디오 + 결합 오디오 → mp4 (hls_dir 지정 시 같은 인코딩으로 HLS도 기록)
+
+    tee muxer로 AAC 인코딩을 한 번만 수행하고 mp4와 HLS 두 출력에 기록합니다.
+    HLS는 playlist_type=event로 세그먼트가 생길 때마다 플레이리스트가 갱신되므로
+    mp4 결합이 끝나기 전에도 앞부분부터 재생할 수 있습니다.
+    """
+    command = [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", video_path,
+        "-i", audio_path,
+        "-map", "0:v:0",
+        "-map", "1:a:0",
+        "-c:v", "copy",
+        "-c:a", "aac",
+        "-shortest"
+    ]
+    if hls_dir is None:
+        return command + ["-f", "mp4", str(mp4_path)]
+
+    hls_options = {
+        "f": "hls",
+        "onfail": "abort",
+        "hls_time": str(config.HLS_SEGMENT_SECONDS),
+        "hls_playlist_type": "event",
+        "hls_flags": "temp_file",
+        "hls_segment_filename": str(hls_dir / "segment_%05d.ts")
+    }
+    # 옵션 값은 옵션 블록(])과 옵션 구분(: =) 두 단계에서 이스케이프가 해석됨
+    options = ":".join(
+        f"{key}={_tee_escape(_tee_escape(value, ':='), ']')}"
+        for key, value in hls_options.items()
+    )
+    outputs = [
+        f"[f=mp4:onfail=abort]{mp4_path}",
+        f"[{options}]{hls_dir / 'playlist.m3u8'}"
+    ]
+    # 두 출력이 같은 AAC 스트림을 공유하므로 mp4용 global header 사용 (HLS는 ADTS로 변환)
+    return command + ["-flags:a", "+global_header", "-f", "tee", "|".join(outputs)]
+
+def run_mux(job: Dict):
+    """결합 실행 후 산출물 등록 (HLS 요청이면 백그라운드 스레드에서 실행)
+
+    mp4는 임시 파일(.{job_id}.mp4)에 기록한 뒤 완료 시 최종 이름으로 교체하므로
+    다운로드 목록에는 완성된 파일만 나타납니다. 결합 오디오는 결합이 끝난 뒤에
+    중간 산출물로 등록합니다 (그 전에 LRU 삭제 대상이 되지 않도록).
+    """
+    job_id = job["job_id"]
+    output_path = job["output_path"]
+    hls_dir = job["hls_dir"]
+    tmp_output = OUTPUT_DIR / f".{job_id}.mp4"
+    try:
+        command = build_mux_command(job["video_path"], str(job["combined_audio"]), tmp_output, hls_dir)
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            raise RuntimeError(f"FFmpeg error: {result.stderr}")
+        # tee는 출력 하나가 열리지 않아도 나머지로 계속 진행하므로 결과 파일 확인
+        if hls_dir is not None and not (hls_dir / "playlist.m3u8").exists():
+            raise RuntimeError(f"HLS packaging failed: {result.stderr}")
+        tmp_output.replace(output_path)
+
+        storage.register(output_path, storage.FINAL, job_id=job_id)
+        if hls_dir is not None:
+            # HLS는 mp4에서 다시 만들 수 있으므로 중간 산출물 (용량 초과 시 작업 디렉토리 단위로 삭제)
+            for path in hls_dir.iterdir():
+                storage.register(path, storage.INTERMEDIATE, job_id=job_id)
+        # 최종 결과물이 등록되었으므로 입력(원본 영상, 오디오 저장소 등)을 삭제 대상으로 되돌림
+        storage.release(job["input_jobs"])
+        job["status"] = "completed"
+        logger.info(f"Combine completed: {job_id}")
+    except Exception as e:
+        logger.error(f"Combine failed for {job_id}: {str(e)}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+        if tmp_output.exists():
+            tmp_output.unlink()
+        if hls_dir is not None:
+            shutil.rmtree(hls_dir, ignore_errors=True)
+    finally:
+        if job["concat_file"] is not None:
+            storage.register(job["concat_file"], storage.INTERMEDIATE, job_id=job_id)
+        storage.register(job["combined_audio"], storage.INTERMEDIATE, job_id=job_id)
+        storage.enforce_quota()
+
+def mix_store_segments(segments_data: List[Dict], output_path) -> None:
+    """오디오 저장소의 세그먼트를 타임스탬프 위치에 배치하여 하나의 WAV로 기록
+
+    각 세그먼트는 memmap 슬라이스로 읽어 그대로 기록하고(복사 없음), 세그먼트
+    시작 시간 전까지는 무음으로 채웁니다. 이전 세그먼트가 길어 겹치는 경우에는
+    바로 뒤에 이어붙입니다.
+    """
+    stores = {}
+    sample_rate = None
+    with wave.open(str(output_path), "wb") as wav_file:
+        position = 0
+        for segment in segments_data:
+            store_name = segment["audio_store"]
+            if store_name not in stores:
+                audio_store = AudioStore(config.AUDIO_STORE_DIR, store_name)
+                if not audio_store.exists():
+                    raise FileNotFoundError(f"Audio store not found: {store_name}")
+                storage.touch(audio_store.pcm_path)
+                stores[store_name] = (audio_store.load_index()["entries"], audio_store.read_all())
+            entries, views = stores[store_name]
+            entry = entries[segment["audio_key"]]
+
+            if sample_rate is None:
+                sample_rate = entry["sample_rate"]
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(SAMPLE_DTYPE.itemsize)
+                wav_file.setframerate(sample_rate)
+            elif entry["sample_rate"] != sample_rate:
+                raise ValueError("Audio segments have different sample rates")
+
+            if segment.get("start") is not None:
+                start = int(round(segment["start"] * sample_rate))
+                if start > position:
+                    wav_file.writeframes(bytes((start - position) * SAMPLE_DTYPE.itemsize))
+                    position = start
+
+            samples = views[segment["audio_key"]]
+            wav_file.writeframes(samples)
+            position += len(samples)
+
+def input_job_ids(video_path: str, segments_data: List[Dict]) -> List[str]:
+    """결합 입력 파일들이 속한 작업 ID (저장소 인덱스 기준)"""
+    job_ids = {seg["audio_store"] for seg in segments_data if "audio_store" in seg}
+    paths = [video_path] + [seg["audio_file"] for seg in segments_data if "audio_file" in seg]
+    for path in paths:
+        artifact = storage.get(path)
+        if artifact is not None and artifact["job_id"]:
+            job_ids.add(artifact["job_id"])
+    return sorted(job_ids)
+
+def output_urls(output_path, job_id: str, hls: bool = False) -> Dict:
+    urls = {
+        "download_url": f"/api/video/download/{output_path.name}",
+        "stream_url": f"/api/video/stream/{output_path.name}"
+    }
+    if hls:
+        urls["hls_url"] = f"/api/video/hls/{job_id}/playlist.m3u8"
+    return urls
 
 @router.post("/combine")
 async def combine_video_audio(
     video_path: str = Form(...),
     audio_segments: str = Form(...),  # JSON string
-    output_filename: str = Form("final_output.mp4")
+    output_filename: str = Form("final_output.mp4"),
+    hls: bool = Form(False)
 ):
-    """비디오와 오디오 세그먼트 결합"""
+    """비디오와 오디오 세그먼트 결합
+
+    hls=True면 mp4와 HLS를 한 번의 인코딩으로 함께 만들고, 첫 HLS 세그먼트가
+    준비되는 즉시 hls_url과 작업 상태 URL을 반환합니다 (mp4는 계속 결합 중).
+    """
     try:
         segments_data = json.loads(audio_segments)
-
-        # 모든 오디오 세그먼트 결합
-        audio_files = [seg["audio_file"] for seg in segments_data]
-
-        # concat 파일 생성
-        concat_file = OUTPUT_DIR / "concat_list.txt"
-        with open(concat_file, "w") as f:
-            for audio_file in audio_files:
-                f.write(f"file '{audio_file}'\n")
-
-        # 오디오 파일 결합
-        combined_audio = OUTPUT_DIR / "combined_audio.wav"
-        concat_command = [
-            "ffmpeg", "-f", "concat", "-safe", "0",
-            "-i", str(concat_file),
-            "-c", "copy",
-            str(combined_audio)
-        ]
-        subprocess.run(concat_command, check=True)
-
-        # 비디오와 결합된 오디오 합치기
         output_path = OUTPUT_DIR / output_filename
-        combine_command = [
-            "ffmpeg",
-            "-i", video_path,
-            "-i", str(combined_audio),
-            "-c:v", "copy",
-            "-c:a", "aac",
-            "-map", "0:v:0",
-            "-map", "1:a:0",
-            "-shortest",
-            str(output_path)
-        ]
-        subprocess.run(combine_command, check=True)
+        # 출력 파일명은 사용자가 정하므로(기본값 공유) 작업 ID는 별도로 생성
+        # 작업별 파일명 사용 (결합이 끝나기 전에 다른 작업이 덮어쓰지 않도록)
+        job_id = uuid.uuid4().hex[:12]
+        combined_audio = OUTPUT_DIR / f"combined_{job_id}.wav"
+        concat_file = None
+
+        if segments_data and all("audio_store" in seg for seg in segments_data):
+            # 오디오 저장소에서 직접 읽어 타임라인에 배치
+            await asyncio.to_thread(mix_store_segments, segments_data, combined_audio)
+        else:
+            # 모든 오디오 세그먼트 결합 (세그먼트별 WAV 파일)
+            audio_files = [seg["audio_file"] for seg in segments_data]
+
+            # concat 파일 생성
+            concat_file = OUTPUT_DIR / f"concat_{job_id}.txt"
+            with open(concat_file, "w") as f:
+                for audio_file in audio_files:
+                    f.write(f"file '{audio_file}'\n")
+
+            # 오디오 파일 결합
+            concat_command = [
+                "ffmpeg", "-f", "concat", "-safe", "0",
+                "-i", str(concat_file),
+                "-c", "copy",
+                str(combined_audio)
+            ]
+            await asyncio.to_thread(subprocess.run, concat_command, check=True)
+
+        hls_dir = HLS_DIR / job_id if hls else None
+        if hls_dir is not None:
+            hls_dir.mkdir(parents=True)
+        job = {
+            "job_id": job_id,
+            "status": "processing",
+            "video_path": video_path,
+            "combined_audio": combined_audio,
+            "concat_file": concat_file,
+            "output_path": output_path,
+            "hls_dir": hls_dir,
+            "input_jobs": await asyncio.to_thread(input_job_ids, video_path, segments_data)
+        }
+        combine_jobs[job_id] = job
+
+        if hls_dir is None:
+            await asyncio.to_thread(run_mux, job)
+        else:
+            # 첫 세그먼트가 기록되면(플레이리스트 생성) 바로 응답하고 결합은 계속 진행
+            threading.Thread(target=run_mux, args=(job,), daemon=True).start()
+            playlist = hls_dir / "playlist.m3u8"
+            while job["status"] == "processing" and not playlist.exists():
+                await asyncio.sleep(0.2)
+
+        if job["status"] == "failed":
+            combine_jobs.pop(job_id, None)
+            raise HTTPException(status_code=500, detail=job["error"])
+        if job["status"] == "completed":
+            combine_jobs.pop(job_id, None)
 
         return {
             "status": "success",
+            "combine_status": job["status"],
             "output_file": str(output_path),
-            "segments_count": len(segments_data)
+            "segments_count": len(segments_data),
+            "job_id": job_id,
+            "status_url": f"/api/video/jobs/{job_id}",
+            **output_urls(output_path, job_id, hls)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/jobs/{job_id}")
+async def combine_job_status(job_id: str):
+    """결합 작업 상태 (HLS 요청 시 mp4 결합 완료 여부 확인용)"""
+    job = combine_jobs.get(job_id)
+    if job is not None:
+        if job["status"] != "processing":
+            combine_jobs.pop(job_id, None)
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "error": job.get("error"),
+            "output_file": str(job["output_path"])
+        }
+
+    # 다른 워커가 처리한 작업은 저장소 인덱스의 최종 결과물로 확인
+    for artifact in storage.job_artifacts(job_id, kind=storage.FINAL):
+        return {"job_id": job_id, "status": "completed", "error": None, "output_file": artifact["path"]}
+    raise HTTPException(status_code=404, detail="Job not found")
+
 @router.post("/process-pipeline")
 async def process_full_pipeline(
     youtube_url: str = Form(None),
     video_file: str = Form(None),
     user_id: str = Form(...),
     target_language: str = Form(...),
-    output_filename: str = Form("final_output.mp4")
+    output_filename: str = Form("final_output.mp4"),
+    hls: bool = Form(False)
 ):
     """전체 파이프라인 실행 (STT → 번역 → TTS → 비디오 결합)"""
     try:
@@ -105,7 +322,8 @@ async def process_full_pipeline(
         final_result = await combine_video_audio(
             video_path=video_path,
             audio_segments=json.dumps(tts_result["segments"]),
-            output_filename=output_filename
+            output_filename=output_filename,
+            hls=hls
         )
 
         return {
@@ -115,24 +333,72 @@ async def process_full_pipeline(
                 "stt": "completed",
                 "translation": "completed",
                 "tts": "completed",
-                "video_combine": "completed"
+                "video_combine": final_result["combine_status"]
+            },
+            "output_file": final_result["output_file"],
+            "job_id": final_result["job_id"],
+            "status_url": final_result["status_url"],
+            "dedup": {
+                "translation": translation_result["dedup"],
+                "tts": tts_result["dedup"]
             },
-            "output_file": final_result["output_file"]
+            **output_urls(OUTPUT_DIR / output_filename, final_result["job_id"], hls)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/outputs")
-async def list_outputs():
-    """생성된 결과 파일 목록"""
+async def list_outputs(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """생성된 결과 파일 목록 (저장소 인덱스 기반 페이지 조회)"""
     try:
+        page = storage.list_artifacts(
+            OUTPUT_DIR, kind=storage.FINAL, suffix=".mp4", offset=offset, limit=limit
+        )
         outputs = []
-        for file_path in OUTPUT_DIR.glob("*.mp4"):
+        for artifact in page["items"]:
             outputs.append({
-                "filename": file_path.name,
-                "path": str(file_path),
-                "size": file_path.stat().st_size
+                "filename": artifact["name"],
+                "path": artifact["path"],
+                "size": artifact["size"],
+                "created_at": artifact["created_at"],
+                "job_id": artifact["job_id"]
             })
-        return {"outputs": outputs}
+        return {
+            "outputs": outputs,
+            "total": page["total"],
+            "offset": offset,
+            "limit": limit
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/storage")
+async def storage_usage():
+    """저장소 사용량 (종류/고정 여부별)"""
+    try:
+        return storage.usage()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.api_route("/download/{filename}", methods=["GET", "HEAD"])
+async def download_output(filename: str, request: Request):
+    """결과 파일 다운로드 (Range 요청 지원)"""
+    path = resolve_media_path(OUTPUT_DIR, filename)
+    return await media_response(request, path, download_name=path.name)
+
+@router.api_route("/stream/{filename}", methods=["GET", "HEAD"])
+async def stream_output(filename: str, request: Request):
+    """결과 비디오 스트리밍 (Range 요청으로 탐색/부분 전송)"""
+    path = resolve_media_path(OUTPUT_DIR, filename)
+    return await media_response(request, path)
+
+@router.api_route("/hls/{job_id}/{filename}", methods=["GET", "HEAD"])
+async def stream_hls(job_id: str, filename: str, request: Request):
+    """HLS 플레이리스트/세그먼트 제공"""
+    path = resolve_media_path(HLS_DIR, job_id, filename)
+    return await media_response(request, path)
@@ -1,15 +1,27 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import List
+import asyncio
 import os
 import json
 import shutil
-from pathlib import Path
+
+import config
+from utils.audio_store import AudioStore
 
 router = APIRouter()
 
 # 음성 데이터 저장 경로
-VOICE_DATA_DIR = Path("../data/voice_models")
-VOICE_DATA_DIR.mkdir(parents=True, exist_ok=True)
+VOICE_DATA_DIR = config.VOICE_MODEL_DIR
+
+def get_sample_store(user_dir) -> AudioStore:
+    """사용자별 학습 샘플 저장소 (samples.pcm + samples.json)"""
+    return AudioStore(user_dir, "samples")
+
+def get_sample_indices(user_dir) -> List[int]:
+    """업로드된 샘플 번호 (저장소 + 이전 형식의 sample_N.wav 파일)"""
+    indices = {int(key) for key in get_sample_store(user_dir).keys()}
+    indices.update(int(f.stem.split("_")[1]) for f in user_dir.glob("sample_*.wav"))
+    return sorted(indices)
 
 # 기본 학습 문장 (40개)
 TRAINING_SENTENCES = [
@@ -75,15 +87,20 @@ async def upload_voice_sample(
         user_dir = VOICE_DATA_DIR / user_id
         user_dir.mkdir(parents=True, exist_ok=True)
 
-        # 파일 저장
-        file_path = user_dir / f"sample_{sentence_index}.wav"
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 샘플 저장 (개별 WAV 파일 대신 사용자별 PCM 저장소에 추가)
+        content = await file.read()
+        sample_store = get_sample_store(user_dir)
+        await asyncio.to_thread(sample_store.append_file, str(sentence_index), content)
+
+        # 참조 음성은 학습 시 다시 생성
+        reference_path = user_dir / "reference.wav"
+        if reference_path.exists():
+            reference_path.unlink()
 
         return {
             "status": "success",
             "message": f"Sample {sentence_index} uploaded successfully",
-            "file_path": str(file_path)
+            "file_path": str(sample_store.pcm_path)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -95,16 +112,13 @@ async def get_training_progress(user_id: str):
     if not user_dir.exists():
         return {"progress": 0, "total": len(TRAINING_SENTENCES), "completed": []}
 
-    # 업로드된 파일 확인
-    uploaded_files = list(user_dir.glob("sample_*.wav"))
-    completed_indices = [
-        int(f.stem.split("_")[1]) for f in uploaded_files
-    ]
+    # 업로드된 샘플 확인
+    completed_indices = get_sample_indices(user_dir)
 
     return {
         "progress": len(completed_indices),
         "total": len(TRAINING_SENTENCES),
-        "completed": sorted(completed_indices)
+        "completed": completed_indices
     }
 
 @router.post("/train/{user_id}")
@@ -115,23 +129,30 @@ async def train_voice_model(user_id: str):
         if not user_dir.exists():
             raise HTTPException(status_code=404, detail="No voice samples found")
 
-        # 업로드된 파일 확인
-        uploaded_files = list(user_dir.glob("sample_*.wav"))
-        if len(uploaded_files) < 30:
+        # 업로드된 샘플 확인
+        completed_indices = get_sample_indices(user_dir)
+        if len(completed_indices) < 30:
             raise HTTPException(
                 status_code=400,
-                detail=f"Insufficient samples. Need at least 30, got {len(uploaded_files)}"
+                detail=f"Insufficient samples. Need at least 30, got {len(completed_indices)}"
             )
 
+        # 다시 녹음된 샘플의 이전 데이터 정리 후 참조 음성 생성
+        sample_store = get_sample_store(user_dir)
+        if sample_store.exists():
+            await asyncio.to_thread(sample_store.compact)
+            first_key = str(min(int(key) for key in sample_store.keys()))
+            sample_store.export_wav(first_key, user_dir / "reference.wav")
+
         # TODO: 실제 TTS 모델 파인튜닝 로직
         # Coqui XTTS-v2를 사용한 음성 복제 모델 학습
 
         # 메타데이터 저장
         metadata = {
             "user_id": user_id,
-            "samples_count": len(uploaded_files),
+            "samples_count": len(completed_indices),
             "status": "trained",
-            "model_path": f"../data/voice_models/{user_id}/model.pth"
+            "model_path": str(user_dir / "model.pth")
         }
 
         with open(user_dir / "metadata.json", "w") as f:
@@ -142,6 +163,8 @@ async def train_voice_model(user_id: str):
             "message": "Voice model training completed",
             "metadata": metadata
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+# 환경 변수 기반 설정 (import 시 디렉토리 생성 등 부수효과 없음)
+
+
+def _env_list(name: str, default: str) -> list:
+    value = os.getenv(name, default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# 데이터 저장 경로 (절대 경로 사용)
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(os.getenv("EBS_DATA_DIR", str(BASE_DIR / "data"))).resolve()
+UPLOAD_DIR = DATA_DIR / "uploads"
+OUTPUT_DIR = DATA_DIR / "outputs"
+VOICE_MODEL_DIR = DATA_DIR / "voice_models"
+
+# 활성화할 라우터 목록 (예: API 전용 파드는 EBS_ENABLED_ROUTERS=translation)
+ALL_ROUTERS = ["voice_training", "stt", "translation", "tts", "video"]
+ENABLED_ROUTERS = _env_list("EBS_ENABLED_ROUTERS", ",".join(ALL_ROUTERS))
+
+# import 시간 예산 (초) - scripts/check_import_time.py 에서 사용
+IMPORT_TIME_BUDGET = float(os.getenv("EBS_IMPORT_TIME_BUDGET", "0.8"))
+
+# 모델 설정
+WHISPER_MODEL_NAME = os.getenv("EBS_WHISPER_MODEL", "base")
+TTS_MODEL_NAME = os.getenv("EBS_TTS_MODEL", "tts_models/multilingual/multi-dataset/xtts_v2")
+
+# 모델 서버 (설정 시 API 워커는 모델을 직접 로드하지 않고 소켓으로 추론 요청)
+MODEL_SERVER_SOCKET = os.getenv("EBS_MODEL_SERVER_SOCKET", "")
+# 소켓으로 받은 요청은 unpickle되므로 기본값 없이 배포마다 비밀 키를 지정해야 함
+MODEL_SERVER_AUTHKEY = os.getenv("EBS_MODEL_SERVER_AUTHKEY", "").encode()
+MODEL_SERVER_QUEUE_SIZE = int(os.getenv("EBS_MODEL_SERVER_QUEUE_SIZE", "64"))
+MODEL_SERVER_BATCH_SIZE = int(os.getenv("EBS_MODEL_SERVER_BATCH_SIZE", "8"))
+MODEL_SERVER_BATCH_WAIT_MS = int(os.getenv("EBS_MODEL_SERVER_BATCH_WAIT_MS", "10"))
+
+# 추론 프로필: "default" (전체 정밀도, CUDA 사용 가능 시 GPU) / "cpu" (int8 동적 양자화)
+INFERENCE_PROFILE = os.getenv("EBS_INFERENCE_PROFILE", "default")
+# torch 스레드 수 (0이면 torch 기본값 유지, 워커별로 지정)
+TORCH_INTRA_OP_THREADS = int(os.getenv("EBS_TORCH_INTRA_OP_THREADS", "0"))
+TORCH_INTER_OP_THREADS = int(os.getenv("EBS_TORCH_INTER_OP_THREADS", "0"))
+# Whisper 백엔드: "openai" (openai-whisper) / "faster-whisper" (CTranslate2, 별도 설치 필요)
+WHISPER_BACKEND = os.getenv("EBS_WHISPER_BACKEND", "openai")
+
+# 세그먼트 재구성: Whisper 조각을 문장 단위로 병합할 때의 최대 길이/간격 (초)
+SEGMENT_MAX_DURATION = float(os.getenv("EBS_SEGMENT_MAX_DURATION", "15.0"))
+SEGMENT_MAX_GAP = float(os.getenv("EBS_SEGMENT_MAX_GAP", "1.0"))
+
+# 추론 스케줄러: 리소스별 동시 실행 슬롯 수와 대기 큐 크기 (초과 시 429 응답)
+STT_CONCURRENCY = int(os.getenv("EBS_STT_CONCURRENCY", "1"))
+STT_MAX_QUEUE = int(os.getenv("EBS_STT_MAX_QUEUE", "16"))
+TTS_CONCURRENCY = int(os.getenv("EBS_TTS_CONCURRENCY", "1"))
+TTS_MAX_QUEUE = int(os.getenv("EBS_TTS_MAX_QUEUE", "32"))
+# interactive(미리듣기) 요청의 별도 대기 큐 크기 (배치 작업이 큐를 채워도 거절되지 않도록)
+STT_INTERACTIVE_MAX_QUEUE = int(os.getenv("EBS_STT_INTERACTIVE_MAX_QUEUE", "8"))
+TTS_INTERACTIVE_MAX_QUEUE = int(os.getenv("EBS_TTS_INTERACTIVE_MAX_QUEUE", "8"))
+
+# 저장소 관리: 인덱스 DB, 용량 한도, 최근 사용 파일 보호 시간
+STORAGE_INDEX_PATH = DATA_DIR / "storage_index.db"
+STORAGE_QUOTA_BYTES = int(float(os.getenv("EBS_STORAGE_QUOTA_GB", "20")) * 1024 ** 3)
+STORAGE_MIN_AGE_SECONDS = int(os.getenv("EBS_STORAGE_MIN_AGE_SECONDS", "3600"))
+# 진행 중인 작업의 입력 보호 최대 시간 (최종 결과물이 등록되면 해제, 완료되지 않은 작업은 이 시간 후 해제)
+STORAGE_HOLD_SECONDS = int(os.getenv("EBS_STORAGE_HOLD_SECONDS", str(24 * 3600)))
+# 시작 시 디렉토리-인덱스 동기화 간격 (여러 워커 중 하나만, 이 시간 안에 다시 시작하면 생략)
+STORAGE_SYNC_INTERVAL_SECONDS = int(os.getenv("EBS_STORAGE_SYNC_INTERVAL_SECONDS", "300"))
+# 다운로드/스트리밍 시 마지막 접근 시간 갱신 간격 (파일별, 워커별)
+STORAGE_TOUCH_INTERVAL_SECONDS = int(os.getenv("EBS_STORAGE_TOUCH_INTERVAL_SECONDS", "60"))
+
+# 미디어 전송: 설정 시 파일 본문은 앞단 nginx가 sendfile로 전송 (X-Accel-Redirect)
+# 예: EBS_ACCEL_REDIRECT_PREFIX=/protected-data/ (nginx internal location → DATA_DIR)
+ACCEL_REDIRECT_PREFIX = os.getenv("EBS_ACCEL_REDIRECT_PREFIX", "")
+MEDIA_CHUNK_SIZE = int(os.getenv("EBS_MEDIA_CHUNK_SIZE", str(1024 * 1024)))
+
+# HLS 패키징
+HLS_DIR = OUTPUT_DIR / "hls"
+HLS_SEGMENT_SECONDS = int(os.getenv("EBS_HLS_SEGMENT_SECONDS", "6"))
+
+# 작업별 세그먼트 오디오 저장소 (PCM blob + 오프셋 인덱스)
+AUDIO_STORE_DIR = OUTPUT_DIR / "audio_store"
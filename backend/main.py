@@ -1,6 +1,15 @@
+import asyncio
+import importlib
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api import voice_training, stt, translation, tts, video
+from fastapi.responses import PlainTextResponse
+
+import config
+from utils import scheduler, storage
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="EBS AI Voice Translation System")
 
@@ -13,12 +22,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# API 라우터 등록
-app.include_router(voice_training.router, prefix="/api/voice", tags=["Voice Training"])
-app.include_router(stt.router, prefix="/api/stt", tags=["Speech to Text"])
-app.include_router(translation.router, prefix="/api/translate", tags=["Translation"])
-app.include_router(tts.router, prefix="/api/tts", tags=["Text to Speech"])
-app.include_router(video.router, prefix="/api/video", tags=["Video Processing"])
+# API 라우터 정의 (모듈명, prefix, 태그)
+ROUTERS = [
+    ("voice_training", "/api/voice", "Voice Training"),
+    ("stt", "/api/stt", "Speech to Text"),
+    ("translation", "/api/translate", "Translation"),
+    ("tts", "/api/tts", "Text to Speech"),
+    ("video", "/api/video", "Video Processing"),
+]
+
+# 업로드/출력 디렉토리에 파일을 만드는 라우터 (저장소 인덱스 동기화 대상)
+STORAGE_ROUTERS = {"stt", "tts", "video"}
+
+# API 라우터 등록 (설정에서 활성화된 라우터만 import)
+for module_name, prefix, tag in ROUTERS:
+    if module_name not in config.ENABLED_ROUTERS:
+        logger.info(f"Router disabled: {module_name}")
+        continue
+    module = importlib.import_module(f"api.{module_name}")
+    app.include_router(module.router, prefix=prefix, tags=[tag])
+
+@app.on_event("startup")
+async def ensure_data_dirs():
+    """데이터 디렉토리 생성 (import 시점이 아닌 서버 시작 시점)"""
+    for directory in (config.UPLOAD_DIR, config.OUTPUT_DIR, config.VOICE_MODEL_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+    # 기존 파일을 저장소 인덱스에 반영 (파일을 만드는 라우터가 있을 때만, 시작을 막지 않도록 백그라운드)
+    if STORAGE_ROUTERS.intersection(config.ENABLED_ROUTERS):
+        asyncio.get_running_loop().run_in_executor(None, storage.sync_index_once)
 
 @app.get("/")
 async def root():
@@ -26,4 +57,9 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "routers": config.ENABLED_ROUTERS}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """추론 큐 지표 (Prometheus 형식, 오토스케일링용)"""
+    return scheduler.prometheus_metrics()
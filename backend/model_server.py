@@ -0,0 +1,198 @@
+"""로컬 모델 서버
+
+Whisper/XTTS 모델을 한 번만 로드하고, 여러 uvicorn 워커의 추론 요청을
+Unix 소켓으로 받아 큐에 쌓은 뒤 하나의 추론 스레드에서 배치 단위로 처리합니다.
+
+사용 예:
+    cd backend
+    export EBS_MODEL_SERVER_SOCKET=/tmp/ebs-models.sock
+    export EBS_MODEL_SERVER_AUTHKEY=$(python -c "import secrets; print(secrets.token_hex(32))")
+    python model_server.py
+    uvicorn main:app --workers 4
+
+multiprocessing.connection은 받은 메시지를 unpickle하므로, 인증 키가 설정되지 않으면
+시작하지 않고 소켓 파일은 소유자만 접근할 수 있도록(0600) 생성합니다.
+"""
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from multiprocessing.connection import Client, Listener
+
+import config
+from models import loader
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InferenceRequest:
+    """큐에 대기 중인 추론 요청 (결과는 done 이벤트로 통지)"""
+
+    def __init__(self, op: str, kwargs: dict):
+        self.op = op
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class ModelServer:
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.requests = queue.Queue(maxsize=config.MODEL_SERVER_QUEUE_SIZE)
+        self.models = {}
+        # 요청당 평균 처리 시간 (지수 이동 평균, 큐가 가득 찼을 때 재시도 시간 추정에 사용)
+        self.avg_service_seconds = 1.0
+        self.handlers = {
+            "transcribe": self._transcribe,
+            "tts": self._tts,
+            "tts_to_file": self._tts_to_file,
+            "tts_sample_rate": self._tts_sample_rate,
+        }
+
+    def _get_model(self, name: str):
+        # 모델은 해당 작업이 처음 요청될 때 로드
+        if name not in self.models:
+            if name == "whisper":
+                self.models[name] = loader.load_whisper_model()
+            else:
+                self.models[name] = loader.load_tts_model()
+        return self.models[name]
+
+    def _transcribe(self, audio: str, **kwargs):
+        return self._get_model("whisper").transcribe(audio, **kwargs)
+
+    def _tts(self, **kwargs):
+        import numpy as np
+
+        return np.asarray(self._get_model("tts").tts(**kwargs), dtype=np.float32)
+
+    def _tts_sample_rate(self):
+        return self._get_model("tts").synthesizer.output_sample_rate
+
+    def _tts_to_file(self, **kwargs):
+        self._get_model("tts").tts_to_file(**kwargs)
+        return {"file_path": kwargs["file_path"]}
+
+    def _next_batch(self) -> list:
+        """첫 요청을 기다린 뒤 대기 시간 동안 추가 요청을 모아 배치 구성"""
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + config.MODEL_SERVER_BATCH_WAIT_MS / 1000
+        while len(batch) < config.MODEL_SERVER_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def inference_loop(self):
+        """단일 추론 스레드: 같은 작업끼리 묶어 모델 전환 없이 연속 처리"""
+        while True:
+            batch = self._next_batch()
+            groups = defaultdict(list)
+            for request in batch:
+                groups[request.op].append(request)
+
+            for op, requests in groups.items():
+                logger.info(f"Running batch: {op} x {len(requests)} (queued: {self.requests.qsize()})")
+                for request in requests:
+                    started = time.monotonic()
+                    try:
+                        request.result = self.handlers[op](**request.kwargs)
+                    except Exception as e:
+                        logger.error(f"Inference failed ({op}): {str(e)}", exc_info=True)
+                        request.error = str(e)
+                    finally:
+                        elapsed = time.monotonic() - started
+                        self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * elapsed
+                        request.done.set()
+
+    def handle_connection(self, conn):
+        """클라이언트 연결 하나당 요청 하나 처리"""
+        try:
+            message = conn.recv()
+            op = message.get("op")
+            if op not in self.handlers:
+                conn.send({"status": "error", "error": f"Unknown operation: {op}"})
+                return
+
+            request = InferenceRequest(op, message.get("kwargs", {}))
+            try:
+                self.requests.put_nowait(request)
+            except queue.Full:
+                queued = self.requests.qsize()
+                conn.send({
+                    "status": "error",
+                    "code": "queue_full",
+                    "error": "Model server queue is full",
+                    "queue_position": queued + 1,
+                    "retry_after": max(1, math.ceil(self.avg_service_seconds * (queued + 1)))
+                })
+                return
+
+            request.done.wait()
+            if request.error is not None:
+                conn.send({"status": "error", "error": request.error})
+            else:
+                conn.send({"status": "success", "result": request.result})
+        except (EOFError, OSError) as e:
+            logger.warning(f"Client connection closed: {str(e)}")
+        finally:
+            conn.close()
+
+    def _remove_stale_socket(self):
+        """이전 프로세스가 남긴 소켓 파일 정리 (다른 서버가 응답 중이면 시작 중단)"""
+        if not os.path.exists(self.socket_path):
+            return
+        try:
+            Client(self.socket_path, family="AF_UNIX", authkey=config.MODEL_SERVER_AUTHKEY).close()
+        except (ConnectionRefusedError, FileNotFoundError):
+            # 연결을 받는 프로세스가 없으므로 남은 소켓 파일
+            os.unlink(self.socket_path)
+            return
+        except Exception as e:
+            # 연결은 되었지만 인증 등에 실패 - 다른 프로세스가 사용 중인 소켓
+            raise SystemExit(f"Socket {self.socket_path} is in use by another process: {str(e)}")
+        raise SystemExit(f"Model server is already running on {self.socket_path}")
+
+    def _listen(self) -> Listener:
+        """소유자만 접근 가능한 소켓 생성 (bind 시점부터 0600이 되도록 umask 적용)"""
+        previous_umask = os.umask(0o177)
+        try:
+            listener = Listener(self.socket_path, family="AF_UNIX",
+                                authkey=config.MODEL_SERVER_AUTHKEY)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(self.socket_path, 0o600)
+        return listener
+
+    def serve_forever(self):
+        self._remove_stale_socket()
+        listener = self._listen()
+
+        threading.Thread(target=self.inference_loop, daemon=True).start()
+
+        with listener:
+            logger.info(f"Model server listening on {self.socket_path}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.warning(f"Rejected connection: {str(e)}")
+                    continue
+                threading.Thread(target=self.handle_connection, args=(conn,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    if not config.MODEL_SERVER_SOCKET:
+        raise SystemExit("EBS_MODEL_SERVER_SOCKET is not set")
+    if not config.MODEL_SERVER_AUTHKEY:
+        raise SystemExit("EBS_MODEL_SERVER_AUTHKEY is not set (use a random secret shared with the API workers)")
+    ModelServer(config.MODEL_SERVER_SOCKET).serve_forever()
@@ -0,0 +1,75 @@
+from multiprocessing.connection import Client
+
+from fastapi import HTTPException
+
+import config
+
+
+class ModelServerError(Exception):
+    """모델 서버에서 발생한 추론 오류"""
+
+
+def call_model_server(op: str, **kwargs):
+    """모델 서버에 추론 요청을 보내고 결과를 기다림 (서버 큐가 가득 차면 429)"""
+    if not config.MODEL_SERVER_AUTHKEY:
+        raise ModelServerError("EBS_MODEL_SERVER_AUTHKEY is not set")
+    with Client(config.MODEL_SERVER_SOCKET, family="AF_UNIX",
+                authkey=config.MODEL_SERVER_AUTHKEY) as conn:
+        conn.send({"op": op, "kwargs": kwargs})
+        response = conn.recv()
+
+    if response.get("code") == "queue_full":
+        # 스케줄러의 admission 거절과 같은 형식으로 응답
+        retry_after = response["retry_after"]
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": response["error"],
+                "resource": "model_server",
+                "queue_position": response["queue_position"],
+                "retry_after": retry_after
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+    if response["status"] != "success":
+        raise ModelServerError(response["error"])
+    return response["result"]
+
+
+class RemoteWhisperModel:
+    """whisper 모델과 동일한 transcribe 인터페이스를 제공하는 프록시"""
+
+    def transcribe(self, audio, **kwargs):
+        return call_model_server("transcribe", audio=str(audio), **kwargs)
+
+
+class RemoteTTSModel:
+    """TTS 모델과 동일한 tts/tts_to_file 인터페이스를 제공하는 프록시"""
+
+    _sample_rate = None
+
+    @property
+    def output_sample_rate(self) -> int:
+        if self._sample_rate is None:
+            self._sample_rate = call_model_server("tts_sample_rate")
+        return self._sample_rate
+
+    def tts(self, text, speaker_wav, language, **kwargs):
+        """합성된 샘플(float32 배열)을 소켓으로 전달받음"""
+        return call_model_server(
+            "tts",
+            text=text,
+            speaker_wav=str(speaker_wav),
+            language=language,
+            **kwargs
+        )
+
+    def tts_to_file(self, text, file_path, speaker_wav, language, **kwargs):
+        return call_model_server(
+            "tts_to_file",
+            text=text,
+            file_path=str(file_path),
+            speaker_wav=str(speaker_wav),
+            language=language,
+            **kwargs
+        )
@@ -0,0 +1,191 @@
+import logging
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_torch_configured = False
+
+
+def configure_torch_threads():
+    """설정된 intra/inter-op 스레드 수를 torch에 적용 (프로세스당 한 번)"""
+    global _torch_configured
+    if _torch_configured:
+        return
+    import torch
+
+    if config.TORCH_INTRA_OP_THREADS > 0:
+        torch.set_num_threads(config.TORCH_INTRA_OP_THREADS)
+    if config.TORCH_INTER_OP_THREADS > 0:
+        try:
+            torch.set_num_interop_threads(config.TORCH_INTER_OP_THREADS)
+        except RuntimeError as e:
+            # inter-op 스레드 수는 병렬 작업 시작 전에만 변경 가능
+            logger.warning(f"Could not set inter-op threads: {str(e)}")
+    logger.info(
+        f"Torch threads: intra-op={torch.get_num_threads()}, "
+        f"inter-op={torch.get_num_interop_threads()}"
+    )
+    _torch_configured = True
+
+
+def _plain_linear(child, linear_types: tuple):
+    """양자화 대상이 되도록 Linear 계열 모듈을 torch.nn.Linear로 변환 (가중치 공유)
+
+    quantize_dynamic은 모듈 타입을 정확히 비교하므로 nn.Linear의 서브클래스
+    (whisper.model.Linear)나 transformers Conv1D(GPT2 블록)는 그대로 두면 건너뜁니다.
+    """
+    import torch
+
+    if type(child) is torch.nn.Linear or not isinstance(child, linear_types):
+        return None
+    if isinstance(child, torch.nn.modules.linear.NonDynamicallyQuantizableLinear):
+        return None
+
+    if isinstance(child, torch.nn.Linear):
+        linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+        linear.weight = child.weight
+        linear.bias = child.bias
+        return linear
+
+    # transformers Conv1D: weight 모양이 (in_features, out_features)
+    in_features, out_features = child.weight.shape
+    linear = torch.nn.Linear(in_features, out_features, bias=True)
+    linear.weight = torch.nn.Parameter(child.weight.detach().t().contiguous())
+    linear.bias = child.bias
+    return linear
+
+
+def _swap_linear_modules(module, linear_types: tuple) -> int:
+    swapped = 0
+    for name, child in module.named_children():
+        linear = _plain_linear(child, linear_types)
+        if linear is not None:
+            setattr(module, name, linear)
+            swapped += 1
+        else:
+            swapped += _swap_linear_modules(child, linear_types)
+    return swapped
+
+
+def quantize_linear_layers(module, name: str):
+    """Linear 레이어를 int8 동적 양자화 (CPU 전용)
+
+    반환값: (양자화된 모듈, 실제로 int8로 변환된 Linear 수)
+    """
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicQuantizedLinear
+
+    linear_types = (torch.nn.Linear,)
+    try:
+        from transformers.pytorch_utils import Conv1D
+
+        linear_types += (Conv1D,)
+    except ImportError:
+        pass
+
+    swapped = _swap_linear_modules(module, linear_types)
+    module = torch.quantization.quantize_dynamic(
+        module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+    converted = sum(isinstance(m, DynamicQuantizedLinear) for m in module.modules())
+    logger.info(f"{name}: quantized {converted} Linear modules to int8 ({swapped} swapped to nn.Linear)")
+    if converted == 0:
+        logger.warning(f"{name}: no modules were quantized, model runs in fp32")
+    return module, converted
+
+
+class FasterWhisperModel:
+    """faster-whisper(CTranslate2)를 openai-whisper의 transcribe 결과 형식으로 감싸는 어댑터"""
+
+    def __init__(self, model_name: str, compute_type: str):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=config.TORCH_INTRA_OP_THREADS
+        )
+
+    def transcribe(self, audio, **kwargs):
+        kwargs.pop("fp16", None)
+        segments, info = self.model.transcribe(str(audio), **kwargs)
+        segments = [
+            {
+                "id": i,
+                "seek": 0,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": segment.tokens,
+                "temperature": segment.temperature,
+                "avg_logprob": segment.avg_logprob,
+                "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            for i, segment in enumerate(segments)
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language
+        }
+
+
+class CPUWhisperModel:
+    """CPU 프로필용 openai-whisper 래퍼 (fp16 비활성화)"""
+
+    def __init__(self, model, quantized_modules: int):
+        self.model = model
+        self.quantized_modules = quantized_modules
+
+    def transcribe(self, audio, **kwargs):
+        kwargs.setdefault("fp16", False)
+        return self.model.transcribe(audio, **kwargs)
+
+
+def load_whisper_model():
+    """Whisper 모델 로드 (무거운 의존성은 호출 시점에 import)"""
+    cpu_profile = config.INFERENCE_PROFILE == "cpu"
+    logger.info(
+        f"Loading Whisper model: {config.WHISPER_MODEL_NAME} "
+        f"(backend={config.WHISPER_BACKEND}, profile={config.INFERENCE_PROFILE})"
+    )
+
+    if config.WHISPER_BACKEND == "faster-whisper":
+        compute_type = "int8" if cpu_profile else "default"
+        model = FasterWhisperModel(config.WHISPER_MODEL_NAME, compute_type)
+    elif cpu_profile:
+        import whisper
+
+        configure_torch_threads()
+        model = whisper.load_model(config.WHISPER_MODEL_NAME, device="cpu")
+        model = CPUWhisperModel(*quantize_linear_layers(model, "Whisper"))
+    else:
+        import whisper
+
+        configure_torch_threads()
+        model = whisper.load_model(config.WHISPER_MODEL_NAME)
+
+    logger.info("Whisper model loaded successfully")
+    return model
+
+
+def load_tts_model():
+    """Coqui XTTS-v2 모델 로드 (다국어 + 음성 복제 지원)"""
+    import torch
+    from TTS.api import TTS
+
+    configure_torch_threads()
+    logger.info(f"Loading TTS model: {config.TTS_MODEL_NAME} (profile={config.INFERENCE_PROFILE})")
+    model = TTS(config.TTS_MODEL_NAME)
+    if config.INFERENCE_PROFILE == "cpu":
+        model.synthesizer.tts_model, model.quantized_modules = quantize_linear_layers(
+            model.synthesizer.tts_model, "XTTS"
+        )
+    elif torch.cuda.is_available():
+        model = model.to("cuda")
+    logger.info("TTS model loaded successfully")
+    return model
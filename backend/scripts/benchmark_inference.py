@@ -0,0 +1,358 @@
+"""Whisper/XTTS 추론 프로필별 정확도/지연시간 비교
+
+각 프로필로 모델을 로드해 같은 입력을 처리하고, 결과를 JSON 데이터와
+Markdown 리포트로 저장합니다.
+
+- Whisper: 오디오와 같은 이름의 .txt 파일이 있으면 이를 정답으로 사용하고,
+  없으면 첫 번째 프로필(default) 결과를 기준으로 WER/CER을 계산합니다.
+- XTTS: 같은 문장을 같은 시드로 합성하여 지연시간, 실시간 배율(RTF),
+  default 출력 대비 스펙트럼 유사도를 비교합니다. --tts-asr을 지정하면
+  합성 음성을 Whisper로 다시 인식해 입력 문장 대비 CER도 계산합니다.
+
+사용 예:
+    cd backend
+    python scripts/benchmark_inference.py --audio ../data/uploads/*.wav \\
+        --tts-texts sentences.txt --speaker-wav ../data/voice_models/user001/reference.wav \\
+        --output ../data/benchmark
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import config
+from models import loader
+
+STT_PROFILES = [
+    {"name": "default", "profile": "default", "backend": "openai"},
+    {"name": "cpu-int8", "profile": "cpu", "backend": "openai"},
+    {"name": "faster-whisper-int8", "profile": "cpu", "backend": "faster-whisper"},
+]
+
+TTS_PROFILES = [
+    {"name": "default", "profile": "default"},
+    {"name": "cpu-int8", "profile": "cpu"},
+]
+
+
+def edit_distance(reference: list, hypothesis: list) -> int:
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_item in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_item in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_item != hyp_item)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def error_rates(reference: str, hypothesis: str) -> dict:
+    """단어 오류율(WER)과 문자 오류율(CER) - 한국어는 CER이 더 의미 있음"""
+    ref_words, hyp_words = reference.split(), hypothesis.split()
+    ref_chars = list(reference.replace(" ", ""))
+    hyp_chars = list(hypothesis.replace(" ", ""))
+    return {
+        "wer": edit_distance(ref_words, hyp_words) / max(len(ref_words), 1),
+        "cer": edit_distance(ref_chars, hyp_chars) / max(len(ref_chars), 1)
+    }
+
+
+def spectral_similarity(a, b, frame: int = 1024, hop: int = 512) -> float:
+    """평균 로그 스펙트럼의 코사인 유사도 (샘플링 차이로 파형이 달라도 음색 비교 가능)"""
+    import numpy as np
+
+    def profile(samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) < frame:
+            samples = np.pad(samples, (0, frame - len(samples)))
+        window = np.hanning(frame)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop] * window
+        return np.log1p(np.abs(np.fft.rfft(frames, axis=1))).mean(axis=0)
+
+    pa, pb = profile(a), profile(b)
+    return float(np.dot(pa, pb) / (np.linalg.norm(pa) * np.linalg.norm(pb) + 1e-9))
+
+
+def write_wav(path: Path, samples, sample_rate: int):
+    import numpy as np
+
+    pcm = (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767).astype("<i2")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+
+
+def free_memory():
+    """호출부에서 모델 참조를 지운 뒤 호출 (다음 프로필 로드 전에 메모리 회수)"""
+    gc.collect()
+    try:
+        import torch
+    except ImportError:
+        return
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def run_stt_profile(profile: dict, audio_files: list) -> dict:
+    config.INFERENCE_PROFILE = profile["profile"]
+    config.WHISPER_BACKEND = profile["backend"]
+
+    start = time.perf_counter()
+    model = loader.load_whisper_model()
+    load_seconds = time.perf_counter() - start
+
+    results = []
+    for audio_file in audio_files:
+        start = time.perf_counter()
+        transcription = model.transcribe(str(audio_file))
+        results.append({
+            "audio": str(audio_file),
+            "seconds": time.perf_counter() - start,
+            "text": transcription["text"].strip()
+        })
+    quantized_modules = getattr(model, "quantized_modules", None)
+    del model
+    free_memory()
+    return {
+        "name": profile["name"],
+        "load_seconds": load_seconds,
+        "quantized_modules": quantized_modules,
+        "results": results
+    }
+
+
+def run_tts_profile(profile: dict, texts: list, speaker_wav: Path, language: str, audio_dir: Path) -> dict:
+    import numpy as np
+    import torch
+
+    config.INFERENCE_PROFILE = profile["profile"]
+
+    start = time.perf_counter()
+    model = loader.load_tts_model()
+    load_seconds = time.perf_counter() - start
+    sample_rate = model.synthesizer.output_sample_rate
+
+    results = []
+    for i, text in enumerate(texts):
+        # 같은 시드로 합성하여 프로필 간 차이가 양자화에서만 오도록 함
+        torch.manual_seed(0)
+        start = time.perf_counter()
+        samples = np.asarray(
+            model.tts(text=text, speaker_wav=str(speaker_wav), language=language),
+            dtype=np.float32
+        )
+        seconds = time.perf_counter() - start
+        audio_seconds = len(samples) / sample_rate
+        wav_path = audio_dir / profile["name"] / f"{i}.wav"
+        write_wav(wav_path, samples, sample_rate)
+        results.append({
+            "text": text,
+            "seconds": seconds,
+            "audio_seconds": audio_seconds,
+            "rtf": seconds / audio_seconds if audio_seconds else 0.0,
+            "wav": str(wav_path)
+        })
+    quantized_modules = getattr(model, "quantized_modules", None)
+    del model
+    free_memory()
+    return {
+        "name": profile["name"],
+        "load_seconds": load_seconds,
+        "sample_rate": sample_rate,
+        "quantized_modules": quantized_modules,
+        "results": results
+    }
+
+
+def score_tts_runs(runs: list, asr: bool):
+    """default 출력 대비 스펙트럼 유사도/길이 비율, 선택적으로 Whisper 재인식 CER 계산"""
+    import numpy as np
+
+    def load(path):
+        with wave.open(path, "rb") as wav_file:
+            return np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2") / 32767
+
+    baseline = runs[0]["results"]
+    for run in runs:
+        for result, reference in zip(run["results"], baseline):
+            result["similarity"] = spectral_similarity(load(result["wav"]), load(reference["wav"]))
+            result["duration_ratio"] = (
+                result["audio_seconds"] / reference["audio_seconds"] if reference["audio_seconds"] else 0.0
+            )
+
+    if not asr:
+        return
+    config.INFERENCE_PROFILE = "default"
+    config.WHISPER_BACKEND = "openai"
+    whisper_model = loader.load_whisper_model()
+    for run in runs:
+        for result in run["results"]:
+            transcript = whisper_model.transcribe(result["wav"])["text"].strip()
+            result["asr_text"] = transcript
+            result["asr_cer"] = error_rates(result["text"], transcript)["cer"]
+    del whisper_model
+    free_memory()
+
+
+def quantized_label(run: dict) -> str:
+    if run["quantized_modules"] is None:
+        return "-"
+    if run["quantized_modules"] == 0:
+        return "0 (fp32)"
+    return str(run["quantized_modules"])
+
+
+def average(values: list) -> float:
+    return sum(values) / max(len(values), 1)
+
+
+def build_stt_report(runs: list, references: dict) -> list:
+    baseline = {r["audio"]: r["text"] for r in runs[0]["results"]}
+    lines = [
+        "## Whisper (STT)",
+        "",
+        f"- 모델: `{config.WHISPER_MODEL_NAME}`",
+        f"- 정확도 기준: {'정답 텍스트' if references else runs[0]['name'] + ' 프로필 결과'}",
+        "",
+        "| 프로필 | int8 Linear | 로드 (s) | 평균 변환 (s) | 속도 향상 | WER | CER |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    baseline_latency = None
+    for run in runs:
+        latency = average([r["seconds"] for r in run["results"]])
+        baseline_latency = baseline_latency or latency
+        rates = [
+            error_rates(references.get(r["audio"], baseline[r["audio"]]), r["text"])
+            for r in run["results"]
+        ]
+        lines.append(
+            f"| {run['name']} | {quantized_label(run)} | {run['load_seconds']:.2f} | {latency:.2f} | "
+            f"{baseline_latency / latency if latency else 0:.2f}x | "
+            f"{average([rate['wer'] for rate in rates]):.3f} | {average([rate['cer'] for rate in rates]):.3f} |"
+        )
+    return lines
+
+
+def build_tts_report(runs: list, language: str) -> list:
+    asr = "asr_cer" in runs[0]["results"][0]
+    lines = [
+        "## XTTS (TTS)",
+        "",
+        f"- 모델: `{config.TTS_MODEL_NAME}`, 언어: `{language}`, 문장 수: {len(runs[0]['results'])}",
+        f"- 유사도 기준: {runs[0]['name']} 프로필 출력 (평균 로그 스펙트럼 코사인 유사도)",
+        "",
+        "| 프로필 | int8 Linear | 로드 (s) | 평균 합성 (s) | RTF | 속도 향상 | 스펙트럼 유사도 | 길이 비율 |"
+        + (" 재인식 CER |" if asr else ""),
+        "|---|---|---|---|---|---|---|---|" + ("---|" if asr else ""),
+    ]
+    baseline_latency = None
+    for run in runs:
+        results = run["results"]
+        latency = average([r["seconds"] for r in results])
+        baseline_latency = baseline_latency or latency
+        row = (
+            f"| {run['name']} | {quantized_label(run)} | {run['load_seconds']:.2f} | {latency:.2f} | "
+            f"{average([r['rtf'] for r in results]):.2f} | "
+            f"{baseline_latency / latency if latency else 0:.2f}x | "
+            f"{average([r['similarity'] for r in results]):.3f} | "
+            f"{average([r['duration_ratio'] for r in results]):.2f} |"
+        )
+        if asr:
+            row += f" {average([r['asr_cer'] for r in results]):.3f} |"
+        lines.append(row)
+    return lines
+
+
+def build_report(stt_runs: list, references: dict, tts_runs: list, language: str) -> str:
+    lines = [
+        "# 추론 프로필 비교",
+        "",
+        f"- torch 스레드: intra-op={config.TORCH_INTRA_OP_THREADS or 'default'}, "
+        f"inter-op={config.TORCH_INTER_OP_THREADS or 'default'}",
+        "- int8 Linear: 실제로 int8로 변환된 Linear 모듈 수 (`0 (fp32)`이면 양자화되지 않음)",
+        "",
+    ]
+    if stt_runs:
+        lines += build_stt_report(stt_runs, references) + [""]
+    if tts_runs:
+        lines += build_tts_report(tts_runs, language) + [""]
+    return "\n".join(lines)
+
+
+def run_profiles(profiles: list, selected: list, runner, *args) -> list:
+    runs = []
+    for profile in profiles:
+        if profile["name"] not in selected:
+            continue
+        print(f"Running profile: {profile['name']}")
+        try:
+            runs.append(runner(profile, *args))
+        except ImportError as e:
+            print(f"  skipped ({str(e)})")
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper/XTTS CPU inference benchmark")
+    parser.add_argument("--audio", nargs="*", type=Path, default=[], help="STT benchmark audio files")
+    parser.add_argument("--tts-texts", type=Path, help="TTS benchmark sentences (one per line)")
+    parser.add_argument("--speaker-wav", type=Path, help="reference voice for TTS")
+    parser.add_argument("--tts-language", default="ko")
+    parser.add_argument("--tts-asr", action="store_true", help="re-transcribe TTS output with Whisper")
+    parser.add_argument("--output", type=Path, default=Path("benchmark"))
+    parser.add_argument("--profiles", default=",".join(p["name"] for p in STT_PROFILES))
+    args = parser.parse_args()
+
+    if not args.audio and not args.tts_texts:
+        parser.error("provide --audio and/or --tts-texts")
+    if args.tts_texts and not args.speaker_wav:
+        parser.error("--tts-texts requires --speaker-wav")
+
+    selected = args.profiles.split(",")
+    references = {
+        str(audio): audio.with_suffix(".txt").read_text(encoding="utf-8").strip()
+        for audio in args.audio if audio.with_suffix(".txt").exists()
+    }
+
+    stt_runs = run_profiles(STT_PROFILES, selected, run_stt_profile, args.audio) if args.audio else []
+
+    tts_runs = []
+    if args.tts_texts:
+        texts = [
+            line.strip() for line in args.tts_texts.read_text(encoding="utf-8").splitlines() if line.strip()
+        ]
+        tts_runs = run_profiles(
+            TTS_PROFILES, selected, run_tts_profile,
+            texts, args.speaker_wav, args.tts_language, args.output / "tts"
+        )
+        if tts_runs:
+            score_tts_runs(tts_runs, args.tts_asr)
+
+    if not stt_runs and not tts_runs:
+        raise SystemExit("No profile could be run")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    with open(args.output / "inference_benchmark.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {"stt_runs": stt_runs, "references": references, "tts_runs": tts_runs},
+            f, ensure_ascii=False, indent=2
+        )
+    report = build_report(stt_runs, references, tts_runs, args.tts_language)
+    (args.output / "inference_benchmark.md").write_text(report, encoding="utf-8")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
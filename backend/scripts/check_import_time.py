@@ -0,0 +1,69 @@
+"""main 모듈 import 시간 측정 및 예산 검사
+
+사용 예:
+    cd backend
+    EBS_ENABLED_ROUTERS=translation python scripts/check_import_time.py
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import config
+
+
+def measure_import(module: str = "main", runs: int = 3) -> dict:
+    """새 인터프리터에서 모듈 import 시간을 측정 (가장 빠른 실행 기준)"""
+    timings = []
+    slowest = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=str(BACKEND_DIR),
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+            check=False
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"Import failed: {result.stderr.strip().splitlines()[-1:]}")
+        timings.append(elapsed)
+
+        # -X importtime 출력: "import time: self [us] | cumulative | package"
+        entries = []
+        for line in result.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            entries.append((int(parts[1].strip()), parts[2].strip()))
+        slowest = sorted(entries, reverse=True)[:10]
+
+    return {
+        "seconds": min(timings),
+        "slowest": [{"module": name, "cumulative_ms": us / 1000} for us, name in slowest]
+    }
+
+
+def main():
+    report = measure_import()
+    budget = config.IMPORT_TIME_BUDGET
+
+    print(f"Enabled routers: {', '.join(config.ENABLED_ROUTERS)}")
+    print(f"Import time: {report['seconds']:.3f}s (budget {budget:.3f}s)")
+    for entry in report["slowest"]:
+        print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+
+    if report["seconds"] > budget:
+        print("FAIL: import time budget exceeded")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
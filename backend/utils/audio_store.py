@@ -0,0 +1,224 @@
+import io
+import json
+import os
+import subprocess
+import wave
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.singleflight import file_lock
+
+# 저장 형식: 16-bit little-endian PCM
+SAMPLE_DTYPE = np.dtype("<i2")
+
+# 파싱한 인덱스 캐시 (경로 → (mtime_ns, size), 인덱스), 파일이 바뀌면 다시 읽음
+_INDEX_CACHE_SIZE = 64
+_index_cache: "OrderedDict[str, Tuple[Tuple[int, int], Dict]]" = OrderedDict()
+
+
+def _cache_index(path: Path, index: Dict):
+    stat = path.stat()
+    _index_cache[str(path)] = ((stat.st_mtime_ns, stat.st_size), index)
+    _index_cache.move_to_end(str(path))
+    while len(_index_cache) > _INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+
+
+class AudioStore:
+    """여러 오디오 조각을 하나의 PCM 파일과 오프셋 인덱스로 보관
+
+    {name}.pcm   - 모든 조각의 PCM 샘플을 이어붙인 파일 (append-only)
+    {name}.json  - 조각별 오프셋/길이/샘플레이트 인덱스
+
+    작업별(세그먼트 오디오)·음성별(학습 샘플)로 파일 두 개만 사용하므로 작은 WAV 파일이
+    수천 개 생기지 않으며, 읽기는 memmap 슬라이스로 복사 없이 수행합니다.
+    같은 키를 다시 쓰면 인덱스만 새 위치를 가리키고 이전 데이터는 compact()로 정리합니다.
+    여러 조각을 연속으로 추가할 때는 batch()로 인덱스를 메모리에 두고 마지막에 한 번만 기록합니다.
+    """
+
+    def __init__(self, directory: Path, name: str):
+        self.directory = Path(directory)
+        self.name = name
+        self.pcm_path = self.directory / f"{name}.pcm"
+        self.index_path = self.directory / f"{name}.json"
+        self.lock_path = self.directory / f".{name}.lock"
+        # batch() 중에는 메모리의 인덱스와 열린 PCM 파일 사용
+        self._pending = None
+        self._pcm_file = None
+
+    def exists(self) -> bool:
+        # PCM이 삭제(용량 정리)된 저장소는 인덱스가 남아 있어도 없는 것으로 취급
+        return self.pcm_path.exists() and self.index_path.exists()
+
+    def load_index(self) -> Dict:
+        """인덱스 조회 (파일이 바뀌지 않았으면 캐시 사용, 반환값은 수정하지 말 것)"""
+        if self._pending is not None:
+            return self._pending
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            return {"entries": {}}
+        cached = _index_cache.get(str(self.index_path))
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            _index_cache.move_to_end(str(self.index_path))
+            return cached[1]
+        with open(self.index_path, "r") as f:
+            index = json.load(f)
+        _cache_index(self.index_path, index)
+        return index
+
+    def _copy_index(self) -> Dict:
+        return {"entries": {key: dict(entry) for key, entry in self.load_index()["entries"].items()}}
+
+    def _write_index(self, index: Dict):
+        # 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 인덱스를 보지 않도록)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+        _cache_index(self.index_path, index)
+
+    def keys(self) -> List[str]:
+        return list(self.load_index()["entries"].keys())
+
+    def entry(self, key: str) -> Optional[Dict]:
+        return self.load_index()["entries"].get(key)
+
+    @contextmanager
+    def batch(self):
+        """조각을 연속으로 추가하는 동안 인덱스는 메모리에만 갱신하고 끝날 때 한 번 기록
+
+        작업별 저장소처럼 쓰는 쪽이 하나뿐인 경우에 사용합니다 (조각마다 락/인덱스 재작성 없음).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pending = self._copy_index()
+        self._pcm_file = open(self.pcm_path, "ab")
+        try:
+            yield self
+        finally:
+            self._pcm_file.close()
+            index, self._pending, self._pcm_file = self._pending, None, None
+            with file_lock(self.lock_path):
+                self._write_index(index)
+
+    def append(self, key: str, samples: np.ndarray, sample_rate: int, channels: int = 1) -> Dict:
+        """샘플 추가 (float는 [-1, 1] 범위로 보고 16-bit로 변환)"""
+        samples = np.asarray(samples)
+        if samples.dtype.kind == "f":
+            samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(SAMPLE_DTYPE)
+        else:
+            samples = samples.astype(SAMPLE_DTYPE, copy=False)
+        data = np.ascontiguousarray(samples).tobytes()
+        entry = {
+            "offset": 0,
+            "frames": len(data) // (SAMPLE_DTYPE.itemsize * channels),
+            "sample_rate": sample_rate,
+            "channels": channels
+        }
+
+        if self._pcm_file is not None:
+            entry["offset"] = self._pcm_file.tell()
+            self._pcm_file.write(data)
+            self._pending["entries"][key] = entry
+            return entry
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            with open(self.pcm_path, "ab") as f:
+                entry["offset"] = f.tell()
+                f.write(data)
+            index = self._copy_index()
+            index["entries"][key] = entry
+            self._write_index(index)
+        return entry
+
+    def append_file(self, key: str, source, sample_rate: int = 24000) -> Dict:
+        """임의 형식의 오디오(경로 또는 바이트)를 FFmpeg로 모노 PCM 변환 후 추가"""
+        is_bytes = isinstance(source, (bytes, bytearray))
+        command = [
+            "ffmpeg", "-v", "error",
+            "-i", "pipe:0" if is_bytes else str(source),
+            "-f", "s16le", "-acodec", "pcm_s16le",
+            "-ac", "1", "-ar", str(sample_rate),
+            "pipe:1"
+        ]
+        result = subprocess.run(
+            command,
+            input=source if is_bytes else None,
+            capture_output=True,
+            check=False
+        )
+        if result.returncode != 0:
+            raise ValueError(f"Audio decoding failed: {result.stderr.decode(errors='ignore')}")
+        return self.append(key, np.frombuffer(result.stdout, dtype=SAMPLE_DTYPE), sample_rate)
+
+    def _view(self, pcm: np.ndarray, entry: Dict) -> np.ndarray:
+        start = entry["offset"] // SAMPLE_DTYPE.itemsize
+        return pcm[start:start + entry["frames"] * entry["channels"]]
+
+    def _memmap(self) -> np.ndarray:
+        if self._pcm_file is not None:
+            self._pcm_file.flush()
+        if not self.pcm_path.exists() or self.pcm_path.stat().st_size == 0:
+            return np.zeros(0, dtype=SAMPLE_DTYPE)
+        return np.memmap(self.pcm_path, dtype=SAMPLE_DTYPE, mode="r")
+
+    def read(self, key: str) -> np.ndarray:
+        """memmap 슬라이스 반환 (복사 없음, 읽기 전용)"""
+        entry = self.entry(key)
+        if entry is None:
+            raise KeyError(key)
+        return self._view(self._memmap(), entry)
+
+    def read_all(self) -> Dict[str, np.ndarray]:
+        """인덱스를 한 번만 읽어 모든 조각의 memmap 슬라이스 반환"""
+        # 인덱스를 먼저 읽어야 memmap 범위가 인덱스의 모든 조각을 포함
+        entries = self.load_index()["entries"]
+        pcm = self._memmap()
+        return {key: self._view(pcm, entry) for key, entry in entries.items()}
+
+    def wav_bytes(self, key: str) -> bytes:
+        entry = self.entry(key)
+        if entry is None:
+            raise KeyError(key)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(entry["channels"])
+            wav_file.setsampwidth(SAMPLE_DTYPE.itemsize)
+            wav_file.setframerate(entry["sample_rate"])
+            wav_file.writeframes(self._view(self._memmap(), entry))
+        return buffer.getvalue()
+
+    def export_wav(self, key: str, path: Path) -> Path:
+        """WAV 파일로 내보내기 (WAV 경로가 필요한 외부 도구용)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.wav_bytes(key))
+        return path
+
+    def compact(self):
+        """덮어쓴 키의 이전 데이터를 제거하여 PCM 파일 재작성"""
+        with file_lock(self.lock_path):
+            index = self._copy_index()
+            views = self.read_all()
+            tmp_path = self.pcm_path.with_suffix(".pcm.tmp")
+            with open(tmp_path, "wb") as f:
+                for key, entry in index["entries"].items():
+                    entry["offset"] = f.tell()
+                    f.write(views[key].tobytes())
+            os.replace(tmp_path, self.pcm_path)
+            self._write_index(index)
+
+    def delete(self):
+        """저장소 파일(PCM, 인덱스, 락, 임시 파일)을 한 번에 삭제"""
+        _index_cache.pop(str(self.index_path), None)
+        for path in (
+            self.pcm_path, self.index_path, self.lock_path,
+            self.pcm_path.with_suffix(".pcm.tmp"), self.index_path.with_suffix(".json.tmp")
+        ):
+            if path.exists():
+                path.unlink()
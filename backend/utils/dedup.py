@@ -0,0 +1,38 @@
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """중복 판정용 정규화 (유니코드 NFKC, 공백 정리, 대소문자 무시)"""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def dedup_texts(texts: List[str]) -> Tuple[List[str], List[int]]:
+    """정규화 기준 중복 제거
+
+    반환값: (고유 텍스트 목록, 각 입력이 가리키는 고유 텍스트 인덱스)
+    고유 텍스트는 처음 등장한 원문을 그대로 사용합니다.
+    """
+    unique_texts = []
+    positions = {}
+    index = []
+    for text in texts:
+        key = normalize_text(text)
+        if key not in positions:
+            positions[key] = len(unique_texts)
+            unique_texts.append(text)
+        index.append(positions[key])
+    return unique_texts, index
+
+
+def dedup_stats(total: int, unique: int) -> Dict:
+    return {
+        "total": total,
+        "unique": unique,
+        "duplicates": total - unique,
+        "ratio": round((total - unique) / total, 4) if total else 0.0
+    }
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+import aiofiles
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+import config
+from utils import storage
+
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+# 파일별 마지막 touch 시각 (Range/HLS 요청마다 인덱스 DB에 쓰지 않도록)
+_TOUCH_CACHE_SIZE = 4096
+_last_touch: Dict[Path, float] = {}
+
+
+def resolve_media_path(base_dir: Path, *parts: str) -> Path:
+    """base_dir 하위 파일 경로 확인 (경로 조작 방지)"""
+    base_dir = base_dir.resolve()
+    path = base_dir.joinpath(*parts).resolve()
+    if base_dir not in path.parents or not path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    return path
+
+
+def parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """Range 헤더 해석 → (start, end) 포함 범위
+
+    단일 범위만 지원하며, 다중 범위(bytes=0-1,5-6)나 형식이 잘못된 헤더는 None을
+    반환해 전체 파일로 응답합니다. 범위가 파일 밖이면 416.
+    """
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+
+    start, end = match.group(1), match.group(2)
+    if not start:
+        # bytes=-N: 마지막 N 바이트
+        start, end = max(file_size - int(end), 0), file_size - 1
+    else:
+        start = int(start)
+        end = min(int(end), file_size - 1) if end else file_size - 1
+
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, end
+
+
+def file_validators(stat_result: os.stat_result) -> Dict[str, str]:
+    """ETag/Last-Modified (If-Range로 이어받기 시 파일이 바뀌지 않았는지 확인)"""
+    etag = hashlib.md5(
+        f"{stat_result.st_mtime}-{stat_result.st_size}".encode(), usedforsecurity=False
+    ).hexdigest()
+    return {
+        "ETag": f'"{etag}"',
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True)
+    }
+
+
+async def _iter_file(path: Path, start: int, length: int):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await f.read(min(config.MEDIA_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def touch_throttled(path: Path):
+    """마지막 접근 시간 갱신 (파일별로 일정 간격에 한 번, 이벤트 루프 밖에서 실행)"""
+    now = time.monotonic()
+    if now - _last_touch.get(path, float("-inf")) < config.STORAGE_TOUCH_INTERVAL_SECONDS:
+        return
+    if len(_last_touch) >= _TOUCH_CACHE_SIZE:
+        _last_touch.clear()
+    _last_touch[path] = now
+    await asyncio.to_thread(storage.touch, path)
+
+
+async def media_response(request: Request, path: Path, download_name: Optional[str] = None) -> Response:
+    """Range 요청을 지원하는 파일 응답 (GET/HEAD)
+
+    EBS_ACCEL_REDIRECT_PREFIX가 설정되면 본문은 앞단 nginx가 sendfile로 전송하고
+    (Range 처리 포함), 그렇지 않으면 전체 요청은 FileResponse, 부분 요청은 206으로 응답합니다.
+    If-Range가 현재 ETag/Last-Modified와 다르면 파일이 바뀐 것이므로 전체 파일로 응답합니다.
+    """
+    await touch_throttled(path)
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    headers = {"Accept-Ranges": "bytes"}
+    if download_name:
+        headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+
+    if config.ACCEL_REDIRECT_PREFIX:
+        relative = path.relative_to(config.DATA_DIR)
+        headers["X-Accel-Redirect"] = config.ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(str(relative))
+        return Response(media_type=media_type, headers=headers)
+
+    stat_result = path.stat()
+    file_size = stat_result.st_size
+    headers.update(file_validators(stat_result))
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() in (headers["ETag"], headers["Last-Modified"])):
+        byte_range = parse_range(range_header, file_size)
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{file_size}",
+        "Content-Length": str(length)
+    })
+    if request.method == "HEAD":
+        return Response(status_code=206, media_type=media_type, headers=headers)
+    return StreamingResponse(
+        _iter_file(path, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from fastapi import HTTPException
+
+import config
+
+# 우선순위 클래스 (값이 작을수록 먼저 실행)
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+class ResourceScheduler:
+    """리소스별 동시 실행 슬롯과 우선순위 대기 큐
+
+    슬롯이 모두 사용 중이면 요청은 우선순위 순으로 대기하고, 대기 큐가 가득 차면
+    대기열 위치와 재시도 시간을 담은 429 응답으로 즉시 거절합니다. 대기 큐 한도는
+    우선순위 클래스별로 따로 두어 배치 작업이 큐를 채워도 미리듣기는 거절되지 않습니다.
+    """
+
+    def __init__(self, name: str, slots: int, max_queue: int, interactive_max_queue: int):
+        self.name = name
+        self.slots = slots
+        self.max_queue = {INTERACTIVE: interactive_max_queue, BATCH: max_queue}
+        self.active = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.completed_total = 0
+        # 평균 처리 시간 (지수 이동 평균, 재시도 시간 추정에 사용)
+        self.avg_service_seconds = 1.0
+
+    def queued(self, priority: int = None) -> int:
+        return sum(
+            1 for _, _, waiter in self._waiters
+            if not waiter.done() and (priority is None or waiter.priority == priority)
+        )
+
+    def retry_after(self, position: int) -> int:
+        return max(1, math.ceil(self.avg_service_seconds * position / self.slots))
+
+    def admit(self, priority: int = BATCH):
+        """우선순위 클래스별 대기 큐 여유 확인 (가득 찬 경우 429)"""
+        if self.active >= self.slots and self.queued(priority) >= self.max_queue[priority]:
+            self.rejected_total += 1
+            # 같거나 높은 우선순위의 대기 작업이 먼저 실행됨
+            position = sum(self.queued(p) for p in PRIORITY_NAMES if p <= priority) + 1
+            retry_after = self.retry_after(position)
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "message": f"{self.name} queue is full",
+                    "resource": self.name,
+                    "priority": PRIORITY_NAMES[priority],
+                    "queue_position": position,
+                    "retry_after": retry_after
+                },
+                headers={"Retry-After": str(retry_after)}
+            )
+
+    async def _acquire(self, priority: int):
+        if self.active < self.slots and self.queued() == 0:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        waiter.priority = priority
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소된 경우 다음 대기자에게 양보
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # 슬롯을 그대로 다음 대기자에게 넘김 (active 유지)
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = BATCH, bounded: bool = True):
+        """슬롯 획득 (bounded=False는 이미 admit된 작업의 후속 단계용)"""
+        if bounded:
+            self.admit(priority)
+        self.admitted_total += 1
+        await self._acquire(priority)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * elapsed
+            self.completed_total += 1
+            self._release()
+
+    def metrics(self) -> Dict:
+        return {
+            "resource": self.name,
+            "slots": self.slots,
+            "active": self.active,
+            "queued": {name: self.queued(priority) for priority, name in PRIORITY_NAMES.items()},
+            "max_queue": {PRIORITY_NAMES[priority]: size for priority, size in self.max_queue.items()},
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "completed_total": self.completed_total,
+            "avg_service_seconds": round(self.avg_service_seconds, 3)
+        }
+
+
+# 프로세스별 스케줄러 (uvicorn 워커마다 독립)
+SCHEDULERS = {
+    "stt": ResourceScheduler("stt", config.STT_CONCURRENCY, config.STT_MAX_QUEUE,
+                             config.STT_INTERACTIVE_MAX_QUEUE),
+    "tts": ResourceScheduler("tts", config.TTS_CONCURRENCY, config.TTS_MAX_QUEUE,
+                             config.TTS_INTERACTIVE_MAX_QUEUE),
+}
+
+
+def get_scheduler(name: str) -> ResourceScheduler:
+    return SCHEDULERS[name]
+
+
+def prometheus_metrics() -> str:
+    """스케줄러 지표를 Prometheus 텍스트 형식으로 변환 (오토스케일링용)"""
+    lines = [
+        "# HELP ebs_scheduler_slots Concurrency slots per resource",
+        "# TYPE ebs_scheduler_slots gauge",
+        "# HELP ebs_scheduler_active Running jobs per resource",
+        "# TYPE ebs_scheduler_active gauge",
+        "# HELP ebs_scheduler_queued Queued jobs per resource and priority",
+        "# TYPE ebs_scheduler_queued gauge",
+        "# HELP ebs_scheduler_max_queue Queue bound per resource and priority",
+        "# TYPE ebs_scheduler_max_queue gauge",
+        "# HELP ebs_scheduler_rejected_total Requests rejected with 429",
+        "# TYPE ebs_scheduler_rejected_total counter",
+        "# HELP ebs_scheduler_completed_total Completed jobs",
+        "# TYPE ebs_scheduler_completed_total counter",
+        "# HELP ebs_scheduler_avg_service_seconds Moving average of job duration",
+        "# TYPE ebs_scheduler_avg_service_seconds gauge",
+    ]
+    for scheduler in SCHEDULERS.values():
+        m = scheduler.metrics()
+        label = f'resource="{m["resource"]}"'
+        lines.append(f"ebs_scheduler_slots{{{label}}} {m['slots']}")
+        lines.append(f"ebs_scheduler_active{{{label}}} {m['active']}")
+        for priority, count in m["queued"].items():
+            lines.append(f'ebs_scheduler_queued{{{label},priority="{priority}"}} {count}')
+        for priority, size in m["max_queue"].items():
+            lines.append(f'ebs_scheduler_max_queue{{{label},priority="{priority}"}} {size}')
+        lines.append(f"ebs_scheduler_rejected_total{{{label}}} {m['rejected_total']}")
+        lines.append(f"ebs_scheduler_completed_total{{{label}}} {m['completed_total']}")
+        lines.append(f"ebs_scheduler_avg_service_seconds{{{label}}} {m['avg_service_seconds']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,71 @@
+from typing import Dict, List
+
+import config
+
+# 문장 종결 부호 (한국어/영어/중국어/일본어 공통)
+SENTENCE_ENDINGS = (".", "?", "!", "…", "。", "？", "！")
+
+
+def _ends_sentence(text: str) -> bool:
+    return text.rstrip().rstrip("\"'”’)]").endswith(SENTENCE_ENDINGS)
+
+
+def merge_segments(
+    segments: List[Dict],
+    max_duration: float = None,
+    max_gap: float = None
+) -> List[Dict]:
+    """Whisper 세그먼트 조각을 문장 단위로 병합
+
+    문장 종결 부호, 세그먼트 사이 간격(max_gap), 병합 길이(max_duration)를
+    기준으로 경계를 나눕니다. 병합된 세그먼트는 원본 세그먼트의 id/시간을
+    source_segments에 보관하여 이후 비디오 결합 시 정렬에 사용할 수 있습니다.
+    """
+    if max_duration is None:
+        max_duration = config.SEGMENT_MAX_DURATION
+    if max_gap is None:
+        max_gap = config.SEGMENT_MAX_GAP
+
+    merged = []
+    current = None
+
+    def flush():
+        if current is not None:
+            # Whisper 텍스트는 띄어쓰기 언어에서 앞 공백을 포함하므로 그대로 이어붙임
+            current["text"] = "".join(current.pop("_texts")).strip()
+            merged.append(current)
+
+    for segment in segments:
+        text = segment.get("text", "").strip()
+        if not text:
+            continue
+        start = segment.get("start")
+        end = segment.get("end")
+        source = {"id": segment.get("id"), "start": start, "end": end, "text": text}
+
+        if current is not None:
+            gap = start - current["end"] if start is not None and current["end"] is not None else 0
+            duration = end - current["start"] if end is not None and current["start"] is not None else 0
+            if gap > max_gap or duration > max_duration:
+                flush()
+                current = None
+
+        if current is None:
+            current = {
+                "id": len(merged),
+                "start": start,
+                "end": end,
+                "_texts": [],
+                "source_segments": []
+            }
+
+        current["end"] = end
+        current["_texts"].append(segment["text"])
+        current["source_segments"].append(source)
+
+        if _ends_sentence(text):
+            flush()
+            current = None
+
+    flush()
+    return merged
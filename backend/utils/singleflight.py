@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Hashable
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """동일 키의 동시 요청을 하나의 실행으로 병합
+
+    같은 키로 진행 중인 작업이 있으면 새 작업을 시작하지 않고 그 결과(또는 예외)를
+    함께 받습니다. 작업이 끝나면 키가 제거되므로 결과를 캐시하지는 않습니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+
+            def _forget(done, key=key):
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            future.add_done_callback(_forget)
+        else:
+            logger.info(f"[{self.name}] Joining in-flight request: {key}")
+
+        # 한 요청이 취소되어도 공유 작업은 계속 진행
+        return await asyncio.shield(future)
+
+
+@contextmanager
+def file_lock(lock_path: Path, blocking: bool = True):
+    """프로세스 간 배타적 파일 잠금 (다른 uvicorn 워커와 같은 파일 경합 방지)
+
+    blocking=False면 기다리지 않고, 잠금을 얻었는지 여부를 반환합니다.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "w") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,332 @@
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import config
+from utils.singleflight import file_lock
+
+logger = logging.getLogger(__name__)
+
+# 아티팩트 종류: 중간 산출물은 용량 초과 시 LRU로 삭제, 최종 결과물은 고정(pin)
+INTERMEDIATE = "intermediate"
+FINAL = "final"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    job_id TEXT,
+    pinned INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_lru ON artifacts (pinned, last_access);
+CREATE INDEX IF NOT EXISTS idx_artifacts_listing ON artifacts (directory, kind, created_at);
+CREATE TABLE IF NOT EXISTS holds (
+    job_id TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO artifacts (path, name, directory, kind, size, job_id, pinned, created_at, last_access)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    kind = excluded.kind,
+    size = excluded.size,
+    job_id = COALESCE(excluded.job_id, artifacts.job_id),
+    pinned = excluded.pinned,
+    last_access = excluded.last_access
+"""
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect() -> sqlite3.Connection:
+    """인덱스 DB 연결 (워커 프로세스/스레드 간 공유되므로 호출마다 새로 연결)"""
+    global _initialized
+    if not _initialized:
+        # sqlite3.connect는 상위 디렉토리가 없으면 실패하므로 먼저 생성
+        config.STORAGE_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(config.STORAGE_INDEX_PATH), timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _initialized:
+        with _init_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialized = True
+    return conn
+
+
+def _artifact_row(path: Path, kind: str, job_id: Optional[str], now: float) -> tuple:
+    return (str(path), path.name, str(path.parent), kind, path.stat().st_size,
+            job_id, int(kind == FINAL), now, now)
+
+
+def register(path, kind: str = INTERMEDIATE, job_id: Optional[str] = None):
+    """생성된 파일을 인덱스에 등록 (최종 결과물은 자동 고정)"""
+    path = Path(path)
+    if not path.exists():
+        return
+    with closing(_connect()) as conn, conn:
+        conn.execute(_UPSERT, _artifact_row(path, kind, job_id, time.time()))
+
+
+def touch(path):
+    """파일 재사용 시 마지막 접근 시간 갱신"""
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "UPDATE artifacts SET last_access = ? WHERE path = ?",
+            (time.time(), str(path))
+        )
+
+
+def hold(job_id: str):
+    """작업의 파일을 LRU 삭제 대상에서 제외 (후속 단계가 입력으로 사용하는 동안)
+
+    STT → 번역 → TTS → 결합처럼 여러 요청에 걸친 작업은 중간에 파일을 다시 사용하지
+    않으므로 last_access만으로는 보호되지 않습니다. 최종 결과물을 등록할 때 release()로
+    해제하고, 완료되지 않은 작업은 EBS_STORAGE_HOLD_SECONDS 후 자동으로 해제됩니다.
+    """
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT INTO holds (job_id, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(job_id) DO UPDATE SET expires_at = excluded.expires_at",
+            (job_id, time.time() + config.STORAGE_HOLD_SECONDS)
+        )
+
+
+def release(job_ids):
+    """hold() 해제 (최종 결과물 등록 후 입력 작업들을 삭제 대상으로 되돌림)"""
+    with closing(_connect()) as conn, conn:
+        conn.executemany("DELETE FROM holds WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+
+
+def get(path) -> Optional[Dict]:
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM artifacts WHERE path = ?", (str(path),)).fetchone()
+    return dict(row) if row else None
+
+
+def list_artifacts(
+    directory,
+    kind: Optional[str] = None,
+    suffix: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 50
+) -> Dict:
+    """인덱스 기반 페이지 조회 (디렉토리 스캔 없음, 최신순)"""
+    where = ["directory = ?"]
+    params = [str(directory)]
+    if kind is not None:
+        where.append("kind = ?")
+        params.append(kind)
+    if suffix is not None:
+        where.append("name LIKE ?")
+        params.append(f"%{suffix}")
+    clause = " AND ".join(where)
+
+    with closing(_connect()) as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM artifacts WHERE {clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM artifacts WHERE {clause} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+    return {"total": total, "items": [dict(row) for row in rows]}
+
+
+def job_artifacts(job_id: str, kind: Optional[str] = None) -> List[Dict]:
+    """작업 ID로 등록된 파일 목록"""
+    query = "SELECT * FROM artifacts WHERE job_id = ?"
+    params = [job_id]
+    if kind is not None:
+        query += " AND kind = ?"
+        params.append(kind)
+    with closing(_connect()) as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [dict(row) for row in rows]
+
+
+def usage() -> Dict:
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT kind, pinned, COUNT(*) AS files, COALESCE(SUM(size), 0) AS bytes "
+            "FROM artifacts GROUP BY kind, pinned"
+        ).fetchall()
+    groups = [dict(row) for row in rows]
+    return {
+        "quota_bytes": config.STORAGE_QUOTA_BYTES,
+        "used_bytes": sum(group["bytes"] for group in groups),
+        "groups": groups
+    }
+
+
+def _remove_file(path: str):
+    """아티팩트 삭제 (오디오 저장소는 PCM과 인덱스/락 파일을 하나의 단위로 삭제)"""
+    path = Path(path)
+    if path.suffix == ".pcm" and path.parent == config.AUDIO_STORE_DIR:
+        # numpy는 실제로 저장소를 삭제할 때만 import
+        from utils.audio_store import AudioStore
+
+        AudioStore(path.parent, path.stem).delete()
+    else:
+        os.remove(path)
+
+
+def _evict(conn: sqlite3.Connection, row: sqlite3.Row, cutoff: float) -> List[sqlite3.Row]:
+    """아티팩트 삭제 후 인덱스에서 제거한 행 반환
+
+    HLS 패키지는 플레이리스트와 세그먼트가 모두 있어야 재생되므로 작업 디렉토리 단위로
+    삭제하며, 그중 최근에 사용된 파일이 있으면(재생 중) 삭제하지 않습니다.
+    """
+    directory = Path(row["directory"])
+    if directory.parent == config.HLS_DIR:
+        rows = conn.execute(
+            "SELECT path, size, last_access FROM artifacts WHERE directory = ?", (row["directory"],)
+        ).fetchall()
+        if any(item["last_access"] >= cutoff for item in rows):
+            return []
+        shutil.rmtree(directory, ignore_errors=True)
+        conn.execute("DELETE FROM artifacts WHERE directory = ?", (row["directory"],))
+        return rows
+
+    try:
+        _remove_file(row["path"])
+    except FileNotFoundError:
+        pass
+    conn.execute("DELETE FROM artifacts WHERE path = ?", (row["path"],))
+    return [row]
+
+
+def enforce_quota() -> List[str]:
+    """용량 한도 초과 시 고정되지 않은 중간 산출물을 오래 사용되지 않은 순으로 삭제"""
+    evicted = []
+    with closing(_connect()) as conn, conn:
+        used = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if used <= config.STORAGE_QUOTA_BYTES:
+            return evicted
+
+        # 최근에 사용된 파일과 진행 중인 작업(hold)의 파일은 제외
+        now = time.time()
+        cutoff = now - config.STORAGE_MIN_AGE_SECONDS
+        conn.execute("DELETE FROM holds WHERE expires_at <= ?", (now,))
+        candidates = conn.execute(
+            "SELECT path, directory, size FROM artifacts "
+            "WHERE pinned = 0 AND kind = ? AND last_access < ? "
+            "AND (job_id IS NULL OR job_id NOT IN (SELECT job_id FROM holds)) "
+            "ORDER BY last_access",
+            (INTERMEDIATE, cutoff)
+        ).fetchall()
+
+        removed = set()
+        for row in candidates:
+            if used <= config.STORAGE_QUOTA_BYTES:
+                break
+            if row["path"] in removed:
+                continue
+            try:
+                rows = _evict(conn, row, cutoff)
+            except OSError as e:
+                logger.warning(f"Could not evict {row['path']}: {str(e)}")
+                continue
+            for item in rows:
+                removed.add(item["path"])
+                used -= item["size"]
+                evicted.append(item["path"])
+
+    if evicted:
+        logger.info(f"Evicted {len(evicted)} intermediate files (used: {used / 1024 ** 3:.2f} GB)")
+    if used > config.STORAGE_QUOTA_BYTES:
+        logger.warning(f"Storage quota still exceeded: {used / 1024 ** 3:.2f} GB")
+    return evicted
+
+
+def _sync_kind(path: Path) -> Tuple[str, Optional[str]]:
+    """인덱스에 없는 파일의 종류와 작업 ID 추정"""
+    if path.parent.parent == config.HLS_DIR:
+        # HLS 패키지: hls/{job_id}/playlist.m3u8, segment_*.ts (작업 디렉토리 단위로 삭제 가능)
+        return INTERMEDIATE, path.parent.name
+    # 출력 디렉토리의 mp4는 최종 결과물, 나머지는 중간 산출물로 간주
+    if path.parent == config.OUTPUT_DIR and path.suffix == ".mp4":
+        return FINAL, None
+    return INTERMEDIATE, None
+
+
+def sync_index():
+    """디렉토리와 인덱스 동기화 (하위 디렉토리 포함, 누락 파일 등록, 삭제된 파일 제거)
+
+    등록/삭제는 한 트랜잭션에서 일괄 처리합니다.
+    """
+    with closing(_connect()) as conn:
+        known = {row["path"] for row in conn.execute("SELECT path FROM artifacts")}
+    missing = [(path,) for path in known if not os.path.exists(path)]
+
+    now = time.time()
+    rows = []
+    for directory in (config.UPLOAD_DIR, config.OUTPUT_DIR):
+        if not directory.exists():
+            continue
+        for path in directory.rglob("*"):
+            # 오디오 저장소는 아래에서 저장소 단위로 처리, 락/임시 파일은 제외
+            if (not path.is_file() or path.name.startswith(".") or path.suffix == ".tmp"
+                    or config.AUDIO_STORE_DIR in path.parents or str(path) in known):
+                continue
+            kind, job_id = _sync_kind(path)
+            rows.append(_artifact_row(path, kind, job_id, now))
+
+    # 오디오 저장소는 PCM 파일을 인덱스에 등록하고, PCM 없이 남은 인덱스/락 파일은 정리
+    if config.AUDIO_STORE_DIR.exists():
+        from utils.audio_store import AudioStore
+
+        for path in config.AUDIO_STORE_DIR.iterdir():
+            if path.suffix == ".pcm":
+                if str(path) not in known:
+                    rows.append(_artifact_row(path, INTERMEDIATE, path.stem, now))
+                continue
+            if path.suffix == ".json":
+                name = path.stem
+            elif path.suffix == ".lock" and path.name.startswith("."):
+                name = path.name[1:-len(".lock")]
+            else:
+                continue
+            audio_store = AudioStore(path.parent, name)
+            if not audio_store.pcm_path.exists():
+                audio_store.delete()
+
+    with closing(_connect()) as conn, conn:
+        conn.executemany("DELETE FROM artifacts WHERE path = ?", missing)
+        conn.executemany(_UPSERT, rows)
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('last_sync', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (time.time(),)
+        )
+    logger.info(f"Storage index synced: {len(rows)} registered, {len(missing)} removed")
+    enforce_quota()
+
+
+def sync_index_once():
+    """서버 시작 시 동기화 (워커 중 하나만 실행, 최근에 동기화했으면 생략)"""
+    with file_lock(config.DATA_DIR / ".storage_sync.lock", blocking=False) as acquired:
+        if not acquired:
+            # 다른 워커가 동기화 중
+            return
+        with closing(_connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'last_sync'").fetchone()
+        if row is not None and time.time() - row["value"] < config.STORAGE_SYNC_INTERVAL_SECONDS:
+            return
+        sync_index()